@@ -68,12 +68,16 @@ def install(c,
 
 
 @task
-def test(c, coverage=True, venv=False, report=""):
+def test(c, coverage=True, venv=False, report="", workers=""):
     """Run the unit tests of the package.
+    The tests are distributed over several processes with pytest-xdist
+    if a number of workers is given ("auto" for one per CPU).
     """
     cov = f"--cov={SRC_FOLDER}" if coverage else ""
     report_cmd = f" --cov-report {report}" if report else ""
-    test_cmd = f"pytest {cov}{report_cmd} tests"
+    # Each test class runs entirely on one worker, its setUpClass being done once
+    workers_cmd = f" -n {workers} --dist loadscope" if workers else ""
+    test_cmd = f"pytest {cov}{report_cmd}{workers_cmd} tests"
     c.run(f"chmod +r {TEST_DASI_CFG}; cp -pf {TEST_DASI_CFG} /tmp/")
     if venv:
         activate_cmd = get_activate_venv()
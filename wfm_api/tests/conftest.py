@@ -0,0 +1,45 @@
+"""Fixtures shared by the WFM API tests.
+"""
+import os
+
+import pytest
+from sqlalchemy import event
+
+from wfm_api.utils.database.wfm_database import WFMDatabase
+
+
+# Suffix of the test databases files, so that each pytest-xdist worker has its own files
+os.environ["WFM_TEST_WORKER"] = os.environ.get("PYTEST_XDIST_WORKER", "")
+
+# The test databases are transient: their durability does not matter
+SQLITE_TEST_PRAGMAS = ("journal_mode=MEMORY", "synchronous=OFF", "temp_store=MEMORY")
+
+
+def set_sqlite_test_pragmas(dbapi_connection, _connection_record):
+    """Trades the durability of an SQLite test database for faster commits.
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_TEST_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+@pytest.fixture(name="shared_wfm_db", scope="session")
+def fixture_shared_wfm_db():
+    """In-memory WFM database (with its schema) created once for the whole test session.
+    The tests using it must not leave any data behind them (see RollbackDBTestCase).
+    """
+    wfm_db = WFMDatabase(':memory:')
+    # The engine already holds a connection: set the pragmas on it too
+    event.listen(wfm_db.engine, "connect", set_sqlite_test_pragmas)
+    with wfm_db.engine.connect() as connection:
+        set_sqlite_test_pragmas(connection.connection, None)
+    yield wfm_db
+    wfm_db.engine.dispose()
+
+
+@pytest.fixture(name="class_wfm_db", scope="class")
+def fixture_class_wfm_db(request, shared_wfm_db):
+    """Binds the shared in-memory WFM database to the requesting test class.
+    """
+    request.cls.wfm_db_mock = shared_wfm_db
@@ -19,7 +19,7 @@ from wfm_api.utils.database.wfm_database import WFMDatabase
 
 CURRENT_DIR = Path(__file__).parent.absolute()
 TEST_CONFIG = CURRENT_DIR / "test_data" / "settings.yaml"
-TEST_DATABASE = f"/tmp/{os.environ['USER']}-wfm-api_test.db"
+TEST_DATABASE = f"/tmp/{os.environ['USER']}-wfm-api_test{os.environ.get('WFM_TEST_WORKER', '')}.db"
 TEST_WDF_SBB_OK = CURRENT_DIR / "test_data" / "wdf1_sbb.yaml"
 TEST_WDF_NFS_OK = CURRENT_DIR / "test_data" / "wdf1_nfs.yaml"
 
@@ -110,6 +110,7 @@ class TestEntrypoints(unittest.TestCase):
         self.wdf_sbb_ok = TEST_WDF_SBB_OK
         self.wdf_nfs_ok = TEST_WDF_NFS_OK
         settings = WFMSettings.from_yaml(TEST_CONFIG)
+        settings.database.name = TEST_DATABASE
         test_container = create_container(settings=settings,
                                           routers=wfm_routers,
                                           hooks=[wfm_database_hook])
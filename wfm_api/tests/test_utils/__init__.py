@@ -1,6 +1,11 @@
 """Create WFM database for tests
 """
-import os
+import unittest
+from itertools import count
+
+import pytest
+from sqlalchemy.orm import Session as DBSession
+
 from wfm_api.utils.database.wfm_database import Session, Service, WFMDatabase
 from wfm_api.utils.database.wfm_database import StepDescription, Step
 from wfm_api.utils.database.wfm_database import ObjectActivityLogging
@@ -10,14 +15,8 @@ Copyright (C) Bull S.A.S.
 """
 
 
-TEST_DATABASE = f"/tmp/{os.environ['USER']}-wfm_test.db"
-
-# remove test database if exists
-if os.path.exists(TEST_DATABASE):
-    os.remove(TEST_DATABASE)
-
-# create test database
-test_db = WFMDatabase(name=TEST_DATABASE)
+# create test database: in memory, so each test process (pytest-xdist worker) has its own one
+test_db = WFMDatabase(name=':memory:')
 
 session_s1 = Session(name="s1", workflow_name="test1", user_name='user',
                      start_time=0, end_time=0, status="starting")
@@ -92,3 +91,62 @@ test_db.dbsession.add(step_a20)
 
 test_db.dbsession.commit()
 test_db.dbsession.close()
+
+
+def create_memory_wfm_db() -> WFMDatabase:
+    """Creates an in-memory WFM DB whose session does not expire the objects on commit:
+    the tests read the stored objects back without reloading them.
+    """
+    wfm_db = WFMDatabase(':memory:')
+    wfm_db.dbsession.close()
+    wfm_db.dbsession = DBSession(bind=wfm_db.engine, expire_on_commit=False)
+    return wfm_db
+
+
+class NameIndexTestCase(unittest.TestCase):
+    """Base class for the tests building unique sessions and services names from a per-class
+    index (next(self._idx)).
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Set up the index of the test class.
+        """
+        super().setUpClass()
+        cls._idx = count()
+
+
+@pytest.mark.usefixtures("class_wfm_db")
+class RollbackDBTestCase(unittest.TestCase):
+    """Base class for the tests sharing a WFM DB: by default the in-memory WFM DB of the test
+    session (see the class_wfm_db fixture).
+    Each test runs inside a transaction that is rolled back on tearDown: the commits done
+    by the tested routines do not end that transaction.
+    """
+    # Name of the attribute holding the shared DB
+    db_attribute = 'wfm_db_mock'
+
+    def setUp(self):
+        """Open the transaction the test runs into.
+        """
+        wfm_db = getattr(self, self.db_attribute)
+        self.connection = wfm_db.engine.connect()
+        self.transaction = self.connection.begin()
+        self.shared_dbsession = wfm_db.dbsession
+        wfm_db.dbsession = DBSession(bind=self.connection, expire_on_commit=False)
+
+    def tearDown(self):
+        """Roll back everything the test (and its setUp) stored into the DB.
+        """
+        wfm_db = getattr(self, self.db_attribute)
+        wfm_db.dbsession.close()
+        wfm_db.dbsession = self.shared_dbsession
+        self.transaction.rollback()
+        self.connection.close()
+
+
+class SharedDBTestCase(RollbackDBTestCase):
+    """Base class for the tests using the test database filled above (test_db), shared by
+    the whole test session.
+    """
+    db_test = test_db
+    db_attribute = 'db_test'
@@ -84,10 +84,12 @@ class TestSQLiteDatabase(unittest.TestCase):
         result_filter1 = self.db_test.get_dicts_query(SampleTable, query_filter)
         query_filter2 = "name == 'unexisting'"
         result_filter2 = self.db_test.get_dicts_query(SampleTable, query_filter2)
+        result_param = self.db_test.get_dicts_query(SampleTable, "name == :name", name='item1')
 
         self.assertListEqual(result_all, expected_list)
         self.assertListEqual(result_filter1, expected_list)
         self.assertListEqual(result_filter2, [])
+        self.assertListEqual(result_param, expected_list)
 
     def test_add_query(self):
         """Tests that adding an element to a specific table behaves as expected"""
@@ -1,16 +1,16 @@
 """Tests that utility routines work as expected.
 """
 import os
-import time
 import unittest
 from shutil import which, rmtree
 from pathlib import Path
+from typing import Any, Dict
+from unittest.mock import patch
 import tempfile
 import hashlib
+from functools import lru_cache
 
 from fastapi import HTTPException
-from sqlalchemy.sql import text
-from itertools import count
 
 from wfm_api.config.wfm_settings import WFMSettings
 from wfm_api.utils.utils import remove_duplicates, find_duplicates
@@ -35,20 +35,59 @@ from wfm_api.utils.utils import count_steps_not_stopped, count_services_not_stop
 from wfm_api.utils.utils import check_and_lock_namespaces, one_service_teardown
 from wfm_api.utils.utils import setup_session_fields, setup_service_fields, setup_steps_fields
 from wfm_api.utils.utils import get_wfm_step_status, get_rm_step_status, is_valid_file_name
+from wfm_api.utils.utils import _to_wfm_status
 from wfm_api.utils.misc_utils.misc_utils import check_isabspathname, check_issize, is_hestia_path
 from wfm_api.utils.misc_utils.misc_utils import check_isabspathdir, remove_file, get_newest_file
 from wfm_api.utils.ephemeral_services.slurm_utils import is_lua_based
+from wfm_api.utils.job_managers.slurm_job_manager import SlurmJobManager
 
-from wfm_api.utils.database.wfm_database import WFMDatabase, ObjectActivityLogging
+from wfm_api.utils.database.wfm_database import ObjectActivityLogging
 from wfm_api.utils.database.wfm_database import Session, Service, Base, NamespaceLock
 from wfm_api.utils.database.wfm_database import StepDescription, Step
 
 from wfm_api.utils.errors import UnexistingServiceNameError
 
+from tests.test_utils import NameIndexTestCase, RollbackDBTestCase, create_memory_wfm_db
+
+
+# test configuration files
+TEST_DATA = Path(__file__).parent.absolute() / "test_data"
+SETTINGS_YAML = TEST_DATA / "settings.yaml"
+SLURM_SETTINGS_YAML = TEST_DATA / "slurm_settings.yaml"
+
+# temporary files and directories root: RAM-backed when available, system default otherwise
+TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# error messages of the misc utils check routines
+ERR_SIZE = "is not a correct size format"
+ERR_NAME = "is not a correct directory name"
+ERR_NOT_ABS = "is not an absolute pathname"
+ERR_NOT_DIR = "is not a directory or does not exist"
+ERR_ACCESS = "cannot be accessed"
+
+
+@lru_cache(maxsize=None)
+def _load_settings(test_config: Path) -> WFMSettings:
+    """Loads the WFM settings from a test configuration file, parsing each file only once.
+    """
+    return WFMSettings.from_yaml(test_config)
+
+
+def _step_dict(step: Step) -> Dict[str, Any]:
+    """Returns the information the WFM DB gives for a step.
+    """
+    return {'id': step.id, 'instance_name': step.instance_name, 'status': step.status,
+            'progress': step.progress, 'jobid': step.jobid,
+            'step_description_id': step.step_description_id}
+
+
+def _touch(directory: str, name: str) -> str:
+    """Creates an empty file in a directory and returns its path.
+    """
+    path = os.path.join(directory, name)
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+    return path
 
-# session and service unique indexes by test
-session_index = count()
-service_index = count()
 
 class TestRemoveDuplicates(unittest.TestCase):
     """Test that the function remove_duplicates behaves as expected.
@@ -367,8 +406,7 @@ class TestValidateServicesPart(unittest.TestCase):
     def setUp(self):
         """Set up the tests
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
 
     def test_validate_services_part_all(self):
@@ -1216,7 +1254,7 @@ class TestGetPathsFromDasiCfgFile(unittest.TestCase):
         with two paths attributes
         """
         # create a temporary config file
-        temporary = tempfile.mkstemp()
+        temporary = tempfile.mkstemp(dir=TMP_ROOT)
         dasi_cfg_file = temporary[1]
         with open(dasi_cfg_file, 'a') as cfg_file:
             cfg_file.write('schema: toto\n')
@@ -1236,7 +1274,7 @@ class TestGetPathsFromDasiCfgFile(unittest.TestCase):
         with two spaces attributes
         """
         # create a temporary config file
-        temporary = tempfile.mkstemp()
+        temporary = tempfile.mkstemp(dir=TMP_ROOT)
         dasi_cfg_file = temporary[1]
         with open(dasi_cfg_file, 'a') as cfg_file:
             cfg_file.write('schema: toto\n')
@@ -1259,7 +1297,7 @@ class TestGetPathsFromDasiCfgFile(unittest.TestCase):
         with a relative path value for the root.path attribute
         """
         # create a temporary config file
-        temporary = tempfile.mkstemp()
+        temporary = tempfile.mkstemp(dir=TMP_ROOT)
         dasi_cfg_file = temporary[1]
         dasi_path = 'p1'
         with open(dasi_cfg_file, 'a') as cfg_file:
@@ -1644,7 +1682,7 @@ class TestStoreRunningServices(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
     def test_store_running_services_no_running_service(self):
@@ -1749,19 +1787,19 @@ class TestStoreRunningServices(unittest.TestCase):
         self.wfm_db_mock.delete_service(services[1]['name'])
 
 
-class TestSessionExists(unittest.TestCase):
+class TestSessionExists(NameIndexTestCase):
     """ Test that the function session_exists behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
-        self.session_name = f"ses{next(session_index)}"
+        self.session_name = f"ses{next(self._idx)}"
         session1 = Session(name=self.session_name, workflow_name="wkf1", user_name='user',
                            start_time=123, end_time=123, status='starting')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=123, end_time=123, status='allocated')
@@ -1794,19 +1832,19 @@ class TestSessionExists(unittest.TestCase):
         self.assertEqual(result, 0)
 
 
-class TestLeaveIfSessionExists(unittest.TestCase):
+class TestLeaveIfSessionExists(NameIndexTestCase):
     """ Test that the function leave_if_session_exists behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
-        self.session_name = f"ses{next(session_index)}"
+        self.session_name = f"ses{next(self._idx)}"
         session1 = Session(name=self.session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='starting')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=123, end_time=123, status='allocated')
@@ -1845,19 +1883,19 @@ class TestLeaveIfSessionExists(unittest.TestCase):
         leave_if_session_exists(self.wfm_db_mock, 'unknown', 'wkf1')
 
 
-class TestLeaveIfSessionNotStarted(unittest.TestCase):
+class TestLeaveIfSessionNotStarted(NameIndexTestCase):
     """ Test that the function error_if_session_not_started behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='starting')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=123, end_time=123, status='allocated')
@@ -1880,7 +1918,7 @@ class TestLeaveIfSessionNotStarted(unittest.TestCase):
     def test_error_if_session_not_started_when_session_not_started(self):
         """Tests that error_if_session_not_started behaves as expected when
         when the session is not started"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='stopping')
         # Session w/o service
@@ -1906,7 +1944,7 @@ class TestLeaveIfSessionNotStarted(unittest.TestCase):
     def test_error_if_session_not_started_when_session_started(self):
         """Tests that error_if_session_not_started behaves as expected when
         when the session is started"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session3 = Session(name=session_name, workflow_name="wkf3",
                            start_time=123, end_time=123, status='active')
         # Session w/o service
@@ -1924,19 +1962,19 @@ class TestLeaveIfSessionNotStarted(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestGetSessionListIfUnique(unittest.TestCase):
+class TestGetSessionListIfUnique(NameIndexTestCase):
     """ Test that the function get_session_list_if_unique behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
-        self.session_name = f"ses{next(session_index)}"
+        self.session_name = f"ses{next(self._idx)}"
         session1 = Session(name=self.session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='status_ses1')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=123, end_time=123, status='status_srv1')
@@ -1988,7 +2026,7 @@ class TestGetSessionListIfUnique(unittest.TestCase):
         # Add a 2nd session with the same name
         session2 = Session(name=self.session_name, workflow_name="wkf2",
                            start_time=456, end_time=456, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=session2, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='status_srv2')
@@ -2019,22 +2057,21 @@ class TestGetSessionListIfUnique(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
+class TestGenerateAccessCommandNoSlurm(NameIndexTestCase):
     """ Test that the function generate_access_command behaves as expected
     when there is no slurm installed.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
         if is_lua_based(self.job_mgr_commands):
             self.job_submission_prefix = "#BB_LUA "
         else:
             self.job_submission_prefix = ""
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
     def tearDown(self):
@@ -2043,7 +2080,7 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
     def test_generate_access_command_no_service(self):
         """Tests that generate_access_command behaves as expected when
         when the session has no service attached"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
         session1.services = []
@@ -2070,10 +2107,10 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
     def test_generate_access_command_no_service_allocated(self):
         """Tests that generate_access_command behaves as expected when
         when the services attached to the session are not allocated"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagingin')
@@ -2105,18 +2142,18 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
     def test_generate_access_command_two_services_allocated(self):
         """Tests that generate_access_command behaves as expected when
         when 2 services attached to the session are allocated"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service10 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagedin')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service11 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='allocated')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service12 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagingin')
@@ -2154,14 +2191,14 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
         """Tests that generate_access_command behaves as expected when
         when a single service attached to the session is allocated, type unknown"""
         stype = 'UNKNOWN'
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service10 = Service(session_id=session1, name=service_name, service_type=stype,
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagedin')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service11 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagingin')
@@ -2195,14 +2232,14 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
     def test_generate_access_command_service_ok(self):
         """Tests that generate_access_command behaves as expected when
         when a single service attached to the session is allocated"""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service10 = Service(session_id=session1, name=service_name, service_type='SBB',
                            location='loc10', targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagedin')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service11 = Service(session_id=session1, name=service_name, service_type='SBB',
                            location='loc11', targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagingin')
@@ -2233,18 +2270,17 @@ class TestGenerateAccessCommandNoSlurm(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestGenerateAccessCommandSlurm(unittest.TestCase):
+class TestGenerateAccessCommandSlurm(NameIndexTestCase):
     """ Test that the function generate_access_command behaves as expected
     when there is a slurm installed.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "slurm_settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SLURM_SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
     def tearDown(self):
@@ -2258,14 +2294,14 @@ class TestGenerateAccessCommandSlurm(unittest.TestCase):
             self.job_submission_prefix = "#BB_LUA "
         else:
             self.job_submission_prefix = ""
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='active')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service10 = Service(session_id=session1, name=service_name, service_type='SBB',
                            location='loc10', targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagedin')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service11 = Service(session_id=session1, name=service_name, service_type='SBB',
                            location='loc11', targets='/tmp', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='stagingin')
@@ -2302,7 +2338,7 @@ class TestCheckAndLockNamespaces(unittest.TestCase):
     def setUp(self):
         """Set up the tests
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
         self.ns1 = NamespaceLock(ns_name="ns1", service_name="srv1")
@@ -2342,24 +2378,23 @@ class TestCheckAndLockNamespaces(unittest.TestCase):
         self.assertEqual(result, expected_result)
 
 
-class TestAllServicesAllocated(unittest.TestCase):
+class TestAllServicesAllocated(NameIndexTestCase):
     """ Test that the function all_services_allocated behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        self.wfm_db_mock = create_memory_wfm_db()
 
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='status_ses1')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='target1', flavor='flavor1', datanodes=4,
                            start_time=123, end_time=123, status='status_srv1')
         session1.services = [service1]
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session10 = Session(name=session_name, workflow_name="wkf10",
                             start_time=1230, end_time=1230, status='status_ses1')
         session10.services = []
@@ -2368,9 +2403,6 @@ class TestAllServicesAllocated(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(session1)
         self.wfm_db_mock.dbsession.add(session10)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service1)
-        self.wfm_db_mock.dbsession.refresh(session1)
-        self.wfm_db_mock.dbsession.refresh(session10)
         self.session_id = session1.id
         self.session_no_srv_id = session10.id
 
@@ -2399,7 +2431,7 @@ class TestAllServicesAllocated(unittest.TestCase):
         """Tests that all_services_allocated behaves as expected when
         when only one service is allocated for this session"""
         # Add a service in the allocated state
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=self.session_id, name=service_name, service_type='SBB',
                            targets='target2', flavor='flavor2', datanodes=4,
                            start_time=123, end_time=123, status='allocated')
@@ -2414,7 +2446,7 @@ class TestAllServicesAllocated(unittest.TestCase):
         """Tests that all_services_allocated behaves as expected when
         when only one service is stagedin for this session"""
         # Add a service in the stagedin state
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=self.session_id, name=service_name, service_type='SBB',
                            targets='target2', flavor='flavor2', datanodes=4,
                            start_time=123, end_time=123, status='stagedin')
@@ -2429,14 +2461,14 @@ class TestAllServicesAllocated(unittest.TestCase):
         """Tests that all_services_allocated behaves as expected when
         when all the services are allocated for this session"""
         # Add a new session with its services in the allocated state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='allocated')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='allocated')
@@ -2446,9 +2478,6 @@ class TestAllServicesAllocated(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_allocated(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2462,14 +2491,14 @@ class TestAllServicesAllocated(unittest.TestCase):
         """Tests that all_services_allocated behaves as expected when
         when all the services are stagedin for this session"""
         # Add a new session with its services in the stagedin state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='stagedin')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='stagedin')
@@ -2479,9 +2508,6 @@ class TestAllServicesAllocated(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_allocated(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2496,14 +2522,14 @@ class TestAllServicesAllocated(unittest.TestCase):
         when all the services are allocated or stagedin for this session"""
         # Add a new session with 1 service in the allocated state
         # and 1 service in the stagedin state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='allocated')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='stagedin')
@@ -2513,9 +2539,6 @@ class TestAllServicesAllocated(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_allocated(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2526,19 +2549,18 @@ class TestAllServicesAllocated(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestAllServicesStopped(unittest.TestCase):
+class TestAllServicesStopped(NameIndexTestCase):
     """ Test that the function all_services_stopped behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        self.wfm_db_mock = create_memory_wfm_db()
 
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='status_ses1')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='target1', flavor='flavor1', datanodes=4,
                            start_time=123, end_time=123, status='status_srv1')
@@ -2547,8 +2569,6 @@ class TestAllServicesStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service1)
         self.wfm_db_mock.dbsession.add(session1)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service1)
-        self.wfm_db_mock.dbsession.refresh(session1)
         self.session_id = session1.id
 
     def tearDown(self):
@@ -2570,7 +2590,7 @@ class TestAllServicesStopped(unittest.TestCase):
         """Tests that all_services_stopped behaves as expected when
         when only one service is stopped for this session"""
         # Add a service in the stopped state
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=self.session_id, name=service_name, service_type='SBB',
                            targets='target2', flavor='flavor2', datanodes=4,
                            start_time=123, end_time=123, status='stopped')
@@ -2585,7 +2605,7 @@ class TestAllServicesStopped(unittest.TestCase):
         """Tests that all_services_stopped behaves as expected when
         when only one service is stagedout for this session"""
         # Add a service in the stagedin state
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=self.session_id, name=service_name, service_type='SBB',
                            targets='target2', flavor='flavor2', datanodes=4,
                            start_time=123, end_time=123, status='stagedout')
@@ -2600,14 +2620,14 @@ class TestAllServicesStopped(unittest.TestCase):
         """Tests that all_services_stopped behaves as expected when
         when all the services are stopped for this session"""
         # Add a new session with its services in the stopped state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='stopped')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='stopped')
@@ -2617,9 +2637,6 @@ class TestAllServicesStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_stopped(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2633,14 +2650,14 @@ class TestAllServicesStopped(unittest.TestCase):
         """Tests that all_services_stopped behaves as expected when
         when all the services are stagedout for this session"""
         # Add a new session with its services in the stagedin state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='stagedout')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='stagedout')
@@ -2650,9 +2667,6 @@ class TestAllServicesStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_stopped(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2667,14 +2681,14 @@ class TestAllServicesStopped(unittest.TestCase):
         when all the services are stopped or stagedout for this session"""
         # Add a new session with 1 service in the stopped state
         # and 1 service in the stagedout state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='stopped')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='stagedout')
@@ -2684,9 +2698,6 @@ class TestAllServicesStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = all_services_stopped(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2697,19 +2708,18 @@ class TestAllServicesStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestOneServiceTeardown(unittest.TestCase):
+class TestOneServiceTeardown(NameIndexTestCase):
     """ Test that the function one_service_teardown behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        self.wfm_db_mock = create_memory_wfm_db()
 
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session1 = Session(name=session_name, workflow_name="wkf1",
                            start_time=123, end_time=123, status='status_ses1')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service1 = Service(session_id=session1, name=service_name, service_type='SBB',
                            targets='target1', flavor='flavor1', datanodes=4,
                            start_time=123, end_time=123, status='status_srv1')
@@ -2718,8 +2728,6 @@ class TestOneServiceTeardown(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service1)
         self.wfm_db_mock.dbsession.add(session1)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service1)
-        self.wfm_db_mock.dbsession.refresh(session1)
         self.session_id = session1.id
 
     def tearDown(self):
@@ -2741,7 +2749,7 @@ class TestOneServiceTeardown(unittest.TestCase):
         """Tests that one_service_teardown behaves as expected when
         only one service is teardown for this session"""
         # Add a service in the stopped state
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service2 = Service(session_id=self.session_id, name=service_name, service_type='SBB',
                            targets='target2', flavor='flavor2', datanodes=4,
                            start_time=123, end_time=123, status='teardown')
@@ -2756,14 +2764,14 @@ class TestOneServiceTeardown(unittest.TestCase):
         """Tests that one_service_teardown behaves as expected when
         all the services are teardown for this session"""
         # Add a new session with its services in the stopped state
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         session2 = Session(name=session_name, workflow_name="wkf2",
                            start_time=123, end_time=123, status='status_ses2')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service20 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target20', flavor='flavor20', datanodes=4,
                             start_time=123, end_time=123, status='teardown')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         service21 = Service(session_id=session2, name=service_name, service_type='SBB',
                             targets='target21', flavor='flavor21', datanodes=4,
                             start_time=123, end_time=123, status='teardown')
@@ -2773,9 +2781,6 @@ class TestOneServiceTeardown(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(service21)
         self.wfm_db_mock.dbsession.add(session2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(service20)
-        self.wfm_db_mock.dbsession.refresh(service21)
-        self.wfm_db_mock.dbsession.refresh(session2)
 
         result = one_service_teardown(self.wfm_db_mock, session2.id)
         self.assertEqual(result, True)
@@ -2786,28 +2791,26 @@ class TestOneServiceTeardown(unittest.TestCase):
         self.wfm_db_mock.dbsession.commit()
 
 
-class TestCountServicesNotStopped(unittest.TestCase):
+class TestCountServicesNotStopped(NameIndexTestCase):
     """ Test that the function count_services_not_stopped behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        self.wfm_db_mock = create_memory_wfm_db()
 
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         self.session1 = Session(name=session_name, workflow_name="wkf1",
                                 start_time=123, end_time=123, status='status_ses1')
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         self.service10 = Service(session_id=self.session1, name=service_name, service_type='SBB',
                                  location='location10',
                                  targets='target10', flavor='flavor10', datanodes=4,
                                  start_time=123, end_time=123, status='stopped', jobid=10)
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         self.service11 = Service(session_id=self.session1, name=service_name, service_type='SBB',
                                  location='location11',
                                  targets='target11', flavor='flavor11', datanodes=4,
@@ -2818,15 +2821,9 @@ class TestCountServicesNotStopped(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(self.service11)
         self.wfm_db_mock.dbsession.add(self.session1)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(self.service10)
-        self.wfm_db_mock.dbsession.refresh(self.service11)
-        self.wfm_db_mock.dbsession.refresh(self.session1)
 
     def tearDown(self):
-        self.wfm_db_mock.dbsession.delete(self.service10)
-        self.wfm_db_mock.dbsession.delete(self.service11)
-        self.wfm_db_mock.dbsession.delete(self.session1)
-        self.wfm_db_mock.dbsession.commit()
+        # The in-memory DB is dropped with its engine: no need to delete its content
         self.wfm_db_mock.dbsession.close()
 
     def test_count_services_not_stopped_when_no_service(self):
@@ -2862,8 +2859,7 @@ class TestDeleteAllSessionStepsDescriptions(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        self.wfm_db_mock = create_memory_wfm_db()
 
         self.session_id = 3
         stepd1 = StepDescription(session_id=self.session_id, name='step1', command='command1')
@@ -2871,8 +2867,6 @@ class TestDeleteAllSessionStepsDescriptions(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(stepd1)
         self.wfm_db_mock.dbsession.add(stepd2)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(stepd1)
-        self.wfm_db_mock.dbsession.refresh(stepd2)
         self.stepd_id1 = stepd1.id
         self.stepd_id2 = stepd2.id
 
@@ -2884,8 +2878,8 @@ class TestDeleteAllSessionStepsDescriptions(unittest.TestCase):
         when no step description exists in the StepDescription DB for the session id"""
         delete_all_session_steps_descriptions(self.wfm_db_mock, 123)
         # Check that we didn't generate any log into the DB
-        filter = text("object_type == 'step_description'")
-        result = self.wfm_db_mock.dbsession.query(ObjectActivityLogging).filter(filter).all()
+        result = self.wfm_db_mock.dbsession.query(ObjectActivityLogging).filter(
+            ObjectActivityLogging.object_type == 'step_description').all()
         self.assertListEqual(result, [])
 
     def test_delete_all_steps_descriptions_stepd_for_session_id(self):
@@ -2893,37 +2887,30 @@ class TestDeleteAllSessionStepsDescriptions(unittest.TestCase):
         when some step descriptions exist in the StepDescription DB for the session id"""
         delete_all_session_steps_descriptions(self.wfm_db_mock, self.session_id)
         # Check that we generated 2 logs into the DB
-        filter = text("object_type == 'step_description'")
-        result = self.wfm_db_mock.dbsession.query(ObjectActivityLogging).filter(filter).all()
-        expected_result = [{'id': 1, 'object_type': 'step_description',
-                            'object_id': self.stepd_id1, 'activity': 'removal'},
-                           {'id': 2, 'object_type': 'step_description',
-                            'object_id': self.stepd_id2, 'activity': 'removal'}]
-        list_dicts = [item.dict() for item in result]
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        for idx in (0, 1):
-            self.assertEqual(list_dicts[idx]['object_type'], expected_result[idx]['object_type'])
-            self.assertEqual(list_dicts[idx]['object_id'], expected_result[idx]['object_id'])
-            self.assertEqual(list_dicts[idx]['activity'], expected_result[idx]['activity'])
-
-
-class TestRunStep(unittest.TestCase):
+        result = self.wfm_db_mock.dbsession.query(ObjectActivityLogging).filter(
+            ObjectActivityLogging.object_type == 'step_description').all()
+        expected_result = [('step_description', self.stepd_id1, 'removal'),
+                           ('step_description', self.stepd_id2, 'removal')]
+        # we don't compare the logs ids since we might have added some logs in the init
+        self.assertCountEqual([(item.object_type, item.object_id, item.activity)
+                               for item in result], expected_result)
+
+
+class TestRunStep(NameIndexTestCase):
     """ Test that the function run_step behaves as expected.
     """
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
+        self.wfm_db_mock = create_memory_wfm_db()
         Base.metadata.create_all(bind=self.wfm_db_mock.engine)
 
         self.session_id = 3
         # 1 step description: service type not supported
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         self.service1 = Service(session_id=self.session_id,
                                 name=service_name, service_type='UNSUPPORTED',
                                 targets='/tmp', flavor='small', datanodes=4,
@@ -2935,7 +2922,7 @@ class TestRunStep(unittest.TestCase):
         self.wfm_db_mock.dbsession.add(self.service1)
 
         # 1 step description: command does not contain sbatch
-        service_name = f"srv{next(session_index)}"
+        service_name = f"srv{next(self._idx)}"
         self.service2 = Service(session_id=self.session_id,
                                 name=service_name, service_type='SBB',
                                 targets='/tmp', flavor='small', datanodes=4,
@@ -2953,11 +2940,7 @@ class TestRunStep(unittest.TestCase):
         self.wfm_db_mock.dbsession.refresh(self.service2)
 
     def tearDown(self):
-        self.wfm_db_mock.dbsession.delete(self.stepd1)
-        self.wfm_db_mock.dbsession.delete(self.stepd2)
-        self.wfm_db_mock.dbsession.delete(self.service1)
-        self.wfm_db_mock.dbsession.delete(self.service2)
-        self.wfm_db_mock.dbsession.commit()
+        # The in-memory DB is dropped with its engine: no need to delete its content
         self.wfm_db_mock.dbsession.close()
 
     def test_run_step_when_service_not_supported(self):
@@ -2981,8 +2964,7 @@ class TestGetRMStepStatusSupportedJobMgr(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "slurm_settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SLURM_SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
         self.job_manager = api_settings.jobmanager
 
@@ -3000,8 +2982,7 @@ class TestGetRMStepStatusUnsupportedJobMgr(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
         self.job_manager = api_settings.jobmanager
 
@@ -3024,19 +3005,28 @@ class TestGetWFMStepStatusSupportedJobMgr(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "slurm_settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
-        self.job_mgr_commands = api_settings.command
+        api_settings = _load_settings(SLURM_SETTINGS_YAML)
         self.job_manager = api_settings.jobmanager
+        _to_wfm_status.cache_clear()
 
     def test_get_wfm_step_status(self):
         """Tests that get_wfm_step_status behaves as expected when
         status CANCELLED and COMPLETED are provided"""
-        result = get_wfm_step_status('CANCELLED', self.job_manager.name, self.job_mgr_commands)
+        result = get_wfm_step_status('CANCELLED', self.job_manager.name)
         self.assertEqual(result, 'STOPPED')
-        result = get_wfm_step_status('COMPLETED', self.job_manager.name, self.job_mgr_commands)
+        result = get_wfm_step_status('COMPLETED', self.job_manager.name)
         self.assertEqual(result, 'STOPPED')
 
+    def test_get_wfm_step_status_cached(self):
+        """Tests that get_wfm_step_status converts a status only once"""
+        with patch.object(SlurmJobManager, 'to_wfm_job_status',
+                          return_value='RUNNING') as mock_convert:
+            result = get_wfm_step_status('RUNNING', self.job_manager.name)
+            result_cached = get_wfm_step_status('RUNNING', self.job_manager.name)
+        mock_convert.assert_called_once_with('RUNNING')
+        self.assertEqual(result, 'RUNNING')
+        self.assertEqual(result_cached, result)
+
 
 class TestGetWFMStepStatusUnsupportedJobMgr(unittest.TestCase):
     """ Test that the function get_wfm_step_status behaves as expected
@@ -3045,41 +3035,35 @@ class TestGetWFMStepStatusUnsupportedJobMgr(unittest.TestCase):
     def setUp(self):
         """Set up the tests by creating a mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
-        self.job_mgr_commands = api_settings.command
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_manager = api_settings.jobmanager
 
     def test_get_wfm_step_status(self):
         """Tests that get_wfm_step_status behaves as expected when
         status CANCELLED and COMPLETED are provided"""
-        result = get_wfm_step_status('CANCELLED', self.job_manager.name, self.job_mgr_commands)
+        result = get_wfm_step_status('CANCELLED', self.job_manager.name)
         self.assertEqual(result, '')
-        result = get_wfm_step_status('COMPLETED', self.job_manager.name, self.job_mgr_commands)
+        result = get_wfm_step_status('COMPLETED', self.job_manager.name)
         self.assertEqual(result, '')
 
 
-class TestCountStepsNotStoppedUnsupportedJobManager(unittest.TestCase):
+class TestCountStepsNotStoppedUnsupportedJobManager(RollbackDBTestCase):
     """ Test that the function count_steps_not_stopped behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+        """Set up the tests by filling the mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
         self.job_manager = api_settings.jobmanager
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        super().setUp()
 
         # 1 list with 2 stopped steps
         self.step10 = Step(step_description_id=10, instance_name="step1_1", start_time=10,
                            stop_time=10, status="stopped", progress="Copying 10%", jobid=1)
         self.step11 = Step(step_description_id=10, instance_name="step1_2", start_time=100,
                            stop_time=100, status="stopped", progress="Copying 11%", jobid=10)
-        self.wfm_db_mock.dbsession.add(self.step10)
-        self.wfm_db_mock.dbsession.add(self.step11)
 
         # 1 list with no stopped steps
         self.step20 = Step(step_description_id=20, start_time=20, stop_time=20,
@@ -3088,8 +3072,6 @@ class TestCountStepsNotStoppedUnsupportedJobManager(unittest.TestCase):
         self.step21 = Step(step_description_id=20, start_time=200, stop_time=200,
                            instance_name="step2_2", status="running", progress="Copying 21%",
                            jobid=20)
-        self.wfm_db_mock.dbsession.add(self.step20)
-        self.wfm_db_mock.dbsession.add(self.step21)
 
         # 1 list with 1 stopped step and 1 not stop step
         self.step30 = Step(step_description_id=30, start_time=30, stop_time=30,
@@ -3098,16 +3080,11 @@ class TestCountStepsNotStoppedUnsupportedJobManager(unittest.TestCase):
         self.step31 = Step(step_description_id=30, start_time=300, stop_time=300,
                            instance_name="step3_2", status="running", progress="Copying 31%",
                            jobid=30)
-        self.wfm_db_mock.dbsession.add(self.step30)
-        self.wfm_db_mock.dbsession.add(self.step31)
 
+        self.wfm_db_mock.dbsession.bulk_save_objects([self.step10, self.step11, self.step20,
+                                                      self.step21, self.step30, self.step31],
+                                                     return_defaults=True)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(self.step10)
-        self.wfm_db_mock.dbsession.refresh(self.step11)
-        self.wfm_db_mock.dbsession.refresh(self.step20)
-        self.wfm_db_mock.dbsession.refresh(self.step21)
-        self.wfm_db_mock.dbsession.refresh(self.step30)
-        self.wfm_db_mock.dbsession.refresh(self.step31)
 
         # List of stopped steps for each step list
         self.steps1 = [self.step10, self.step11]
@@ -3117,16 +3094,6 @@ class TestCountStepsNotStoppedUnsupportedJobManager(unittest.TestCase):
         self.steps3 = [self.step30, self.step31]
         self.steps3_stopped = [self.step30]
 
-    def tearDown(self):
-        self.wfm_db_mock.dbsession.delete(self.step10)
-        self.wfm_db_mock.dbsession.delete(self.step11)
-        self.wfm_db_mock.dbsession.delete(self.step20)
-        self.wfm_db_mock.dbsession.delete(self.step21)
-        self.wfm_db_mock.dbsession.delete(self.step30)
-        self.wfm_db_mock.dbsession.delete(self.step31)
-        self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.close()
-
     def test_count_steps_not_stopped_when_no_step_forced(self):
         """Tests that count_steps_not_stopped behaves as expected when
         empty list of steps is passed as param - forced mode"""
@@ -3141,145 +3108,69 @@ class TestCountStepsNotStoppedUnsupportedJobManager(unittest.TestCase):
                                          self.job_mgr_commands)
         self.assertEqual(result, 0)
 
-    def test_count_steps_not_stopped_when_all_steps_stopped_forced(self):
+    def test_count_steps_not_stopped_steps_list(self):
         """Tests that count_steps_not_stopped behaves as expected when
-        all steps in list are stopped - forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step10.step_description_id)
-        expected_result = [{'id': self.step10.id, 'status': self.step10.status,
-                            'progress': self.step10.progress,
-                            'jobid': self.step10.jobid, 'instance_name': self.step10.instance_name,
-                            'step_description_id': self.step10.step_description_id},
-                           {'id': self.step11.id, 'status': self.step11.status,
-                            'progress': self.step11.progress,
-                            'jobid': self.step11.jobid, 'instance_name': self.step11.instance_name,
-                            'step_description_id': self.step11.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, True, self.job_manager.name,
-                                         self.job_mgr_commands)
+        all, none or part of the steps in list are stopped - forced and not forced modes"""
         # Note that since the job manager is not supported (fake) the stopped steps are not
         # accounted for
-        expected_count = len(self.steps1)
-        self.assertEqual(result, expected_count)
-
-    def test_count_steps_not_stopped_when_all_steps_stopped_not_forced(self):
-        """Tests that count_steps_not_stopped behaves as expected when
-        all steps in list are stopped - not forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step10.step_description_id)
-        expected_result = [{'id': self.step10.id, 'status': self.step10.status,
-                            'progress': self.step10.progress,
-                            'jobid': self.step10.jobid, 'instance_name': self.step10.instance_name,
-                            'step_description_id': self.step10.step_description_id},
-                           {'id': self.step11.id, 'status': self.step11.status,
-                            'progress': self.step11.progress,
-                            'jobid': self.step11.jobid, 'instance_name': self.step11.instance_name,
-                            'step_description_id': self.step11.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, False, self.job_manager.name,
-                                         self.job_mgr_commands)
-        # Note that since the job manager is not supported (fake) the stopped steps are not
-        # accounted for
-        expected_count = len(self.steps1)
-        self.assertEqual(result, expected_count)
+        cases = [('all steps stopped - forced', self.steps1, True, len(self.steps1)),
+                 ('all steps stopped - not forced', self.steps1, False, len(self.steps1)),
+                 ('no step stopped - not forced', self.steps2, False,
+                  len(self.steps2) - len(self.steps2_stopped)),
+                 ('part steps stopped - not forced', self.steps3, False, len(self.steps3))]
+        for case, steps_list, forced, expected_count in cases:
+            with self.subTest(case=case):
+                stepd_id = steps_list[0].step_description_id
+                steps = self.wfm_db_mock.get_steps_info_from_step_description_id(stepd_id)
+                expected_result = [_step_dict(step) for step in steps_list]
+                self.assertListEqual(steps, expected_result)
+                result = count_steps_not_stopped(self.wfm_db_mock, steps, forced,
+                                                 self.job_manager.name, self.job_mgr_commands)
+                self.assertEqual(result, expected_count)
 
     @unittest.skip('Skipping forced stop mode when no step is stopped')
     def test_count_steps_not_stopped_when_no_step_stopped_forced(self):
         """Tests that count_steps_not_stopped behaves as expected when
         no step in list is stopped - forced mode"""
         steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step20.step_description_id)
-        expected_result = [{'id': self.step20.id, 'status': self.step20.status,
-                            'progress': self.step20.progress,
-                            'jobid': self.step20.jobid, 'instance_name': self.step20.instance_name,
-                            'step_description_id': self.step20.step_description_id},
-                           {'id': self.step21.id, 'status': self.step21.status,
-                            'progress': self.step21.progress,
-                            'jobid': self.step21.jobid, 'instance_name': self.step21.instance_name,
-                            'step_description_id': self.step21.step_description_id}]
+        expected_result = [_step_dict(self.step20), _step_dict(self.step21)]
         self.assertListEqual(steps, expected_result)
         result = count_steps_not_stopped(self.wfm_db_mock, steps, True, self.job_manager.name,
                                          self.job_mgr_commands)
         expected_count = len(self.steps2) - len(self.steps2_stopped)
         self.assertEqual(result, expected_count)
 
-    def test_count_steps_not_stopped_when_no_step_stopped_not_forced(self):
-        """Tests that count_steps_not_stopped behaves as expected when
-        no step in list is stopped - not forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step20.step_description_id)
-        expected_result = [{'id': self.step20.id, 'status': self.step20.status,
-                            'progress': self.step20.progress,
-                            'jobid': self.step20.jobid, 'instance_name': self.step20.instance_name,
-                            'step_description_id': self.step20.step_description_id},
-                           {'id': self.step21.id, 'status': self.step21.status,
-                            'progress': self.step21.progress,
-                            'jobid': self.step21.jobid, 'instance_name': self.step21.instance_name,
-                            'step_description_id': self.step21.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, False, self.job_manager.name,
-                                         self.job_mgr_commands)
-        expected_count = len(self.steps2) - len(self.steps2_stopped)
-        self.assertEqual(result, expected_count)
-
     @unittest.skip('Skipping forced stop mode when part of steps are stopped')
     def test_count_steps_not_stopped_when_part_steps_stopped_forced(self):
         """Tests that count_steps_not_stopped behaves as expected when
         part of the steps in list are stopped - forced mode"""
         steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step30.step_description_id)
-        expected_result = [{'id': self.step30.id, 'status': self.step30.status,
-                            'progress': self.step30.progress,
-                            'jobid': self.step30.jobid, 'instance_name': self.step30.instance_name,
-                            'step_description_id': self.step30.step_description_id},
-                           {'id': self.step31.id, 'status': self.step31.status,
-                            'progress': self.step31.progress,
-                            'jobid': self.step31.jobid, 'instance_name': self.step31.instance_name,
-                            'step_description_id': self.step31.step_description_id}]
+        expected_result = [_step_dict(self.step30), _step_dict(self.step31)]
         self.assertListEqual(steps, expected_result)
         result = count_steps_not_stopped(self.wfm_db_mock, steps, True, self.job_manager.name,
                                          self.job_mgr_commands)
         expected_count = len(self.steps3) - len(self.steps3_stopped)
         self.assertEqual(result, expected_count)
 
-    def test_count_steps_not_stopped_when_part_steps_stopped_not_forced(self):
-        """Tests that count_steps_not_stopped behaves as expected when
-        part of the steps in list are stopped - not forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step30.step_description_id)
-        expected_result = [{'id': self.step30.id, 'status': self.step30.status,
-                            'progress': self.step30.progress,
-                            'jobid': self.step30.jobid, 'instance_name': self.step30.instance_name,
-                            'step_description_id': self.step30.step_description_id},
-                           {'id': self.step31.id, 'status': self.step31.status,
-                            'progress': self.step31.progress,
-                            'jobid': self.step31.jobid, 'instance_name': self.step31.instance_name,
-                            'step_description_id': self.step31.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, False, self.job_manager.name,
-                                         self.job_mgr_commands)
-        # Note that since the job manager is not supported (fake) the stopped steps are not
-        # accounted for
-        expected_count = len(self.steps3)
-        self.assertEqual(result, expected_count)
-
 
-class TestCountStepsNotStoppedSupportedJobManager(unittest.TestCase):
+class TestCountStepsNotStoppedSupportedJobManager(RollbackDBTestCase):
     """ Test that the function count_steps_not_stopped behaves as expected
     when Job maanger is supported.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+        """Set up the tests by filling the mock WFM database.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "slurm_settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
+        api_settings = _load_settings(SLURM_SETTINGS_YAML)
         self.job_mgr_commands = api_settings.command
         self.job_manager = api_settings.jobmanager
 
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        super().setUp()
 
         # 1 list with 2 stopped steps
         self.step10 = Step(step_description_id=10, instance_name="step1_1", start_time=10,
                            stop_time=10, status="stopped", progress="Copying 10%", jobid=1)
         self.step11 = Step(step_description_id=10, instance_name="step1_2", start_time=100,
                            stop_time=100, status="stopped", progress="Copying 11%", jobid=10)
-        self.wfm_db_mock.dbsession.add(self.step10)
-        self.wfm_db_mock.dbsession.add(self.step11)
 
         # 1 list with 1 stopped step and 1 not stop step
         self.step30 = Step(step_description_id=30, start_time=30, stop_time=30,
@@ -3288,14 +3179,10 @@ class TestCountStepsNotStoppedSupportedJobManager(unittest.TestCase):
         self.step31 = Step(step_description_id=30, start_time=300, stop_time=300,
                            instance_name="step3_2", status="running", progress="Copying 31%",
                            jobid=30)
-        self.wfm_db_mock.dbsession.add(self.step30)
-        self.wfm_db_mock.dbsession.add(self.step31)
 
+        self.wfm_db_mock.dbsession.bulk_save_objects([self.step10, self.step11, self.step30,
+                                                      self.step31], return_defaults=True)
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(self.step10)
-        self.wfm_db_mock.dbsession.refresh(self.step11)
-        self.wfm_db_mock.dbsession.refresh(self.step30)
-        self.wfm_db_mock.dbsession.refresh(self.step31)
 
         # List of stopped steps for each step list
         self.steps1 = [self.step10, self.step11]
@@ -3303,81 +3190,37 @@ class TestCountStepsNotStoppedSupportedJobManager(unittest.TestCase):
         self.steps3 = [self.step30, self.step31]
         self.steps3_stopped = [self.step30]
 
-    def tearDown(self):
-        self.wfm_db_mock.dbsession.delete(self.step10)
-        self.wfm_db_mock.dbsession.delete(self.step11)
-        self.wfm_db_mock.dbsession.delete(self.step30)
-        self.wfm_db_mock.dbsession.delete(self.step31)
-        self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.close()
-
-    def test_count_steps_not_stopped_when_all_steps_stopped_forced(self):
+    def test_count_steps_not_stopped_steps_list(self):
         """Tests that count_steps_not_stopped behaves as expected when
-        all steps in list are stopped - forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step10.step_description_id)
-        expected_result = [{'id': self.step10.id, 'status': self.step10.status,
-                            'progress': self.step10.progress,
-                            'jobid': self.step10.jobid, 'instance_name': self.step10.instance_name,
-                            'step_description_id': self.step10.step_description_id},
-                           {'id': self.step11.id, 'status': self.step11.status,
-                            'progress': self.step11.progress,
-                            'jobid': self.step11.jobid, 'instance_name': self.step11.instance_name,
-                            'step_description_id': self.step11.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, True, self.job_manager.name,
-                                         self.job_mgr_commands)
-        expected_count = len(self.steps1) - len(self.steps1_stopped)
-        self.assertEqual(result, expected_count)
-
-    def test_count_steps_not_stopped_when_all_steps_stopped_not_forced(self):
-        """Tests that count_steps_not_stopped behaves as expected when
-        all steps in list are stopped - not forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step10.step_description_id)
-        expected_result = [{'id': self.step10.id, 'status': self.step10.status,
-                            'progress': self.step10.progress,
-                            'jobid': self.step10.jobid, 'instance_name': self.step10.instance_name,
-                            'step_description_id': self.step10.step_description_id},
-                           {'id': self.step11.id, 'status': self.step11.status,
-                            'progress': self.step11.progress,
-                            'jobid': self.step11.jobid, 'instance_name': self.step11.instance_name,
-                            'step_description_id': self.step11.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, False, self.job_manager.name,
-                                         self.job_mgr_commands)
-        expected_count = len(self.steps1) - len(self.steps1_stopped)
-        self.assertEqual(result, expected_count)
-
-    def test_count_steps_not_stopped_when_part_steps_stopped_not_forced(self):
-        """Tests that count_steps_not_stopped behaves as expected when
-        part of the steps in list are stopped - not forced mode"""
-        steps = self.wfm_db_mock.get_steps_info_from_step_description_id(self.step30.step_description_id)
-        expected_result = [{'id': self.step30.id, 'status': self.step30.status,
-                            'progress': self.step30.progress,
-                            'jobid': self.step30.jobid, 'instance_name': self.step30.instance_name,
-                            'step_description_id': self.step30.step_description_id},
-                           {'id': self.step31.id, 'status': self.step31.status,
-                            'progress': self.step31.progress,
-                            'jobid': self.step31.jobid, 'instance_name': self.step31.instance_name,
-                            'step_description_id': self.step31.step_description_id}]
-        self.assertListEqual(steps, expected_result)
-        result = count_steps_not_stopped(self.wfm_db_mock, steps, False, self.job_manager.name,
-                                         self.job_mgr_commands)
-        expected_count = len(self.steps3) - len(self.steps3_stopped)
-        self.assertEqual(result, expected_count)
-
-
-class TestGetSessionStepFromName(unittest.TestCase):
+        all or part of the steps in list are stopped - forced and not forced modes"""
+        cases = [('all steps stopped - forced', self.steps1, True,
+                  len(self.steps1) - len(self.steps1_stopped)),
+                 ('all steps stopped - not forced', self.steps1, False,
+                  len(self.steps1) - len(self.steps1_stopped)),
+                 ('part steps stopped - not forced', self.steps3, False,
+                  len(self.steps3) - len(self.steps3_stopped))]
+        for case, steps_list, forced, expected_count in cases:
+            with self.subTest(case=case):
+                stepd_id = steps_list[0].step_description_id
+                steps = self.wfm_db_mock.get_steps_info_from_step_description_id(stepd_id)
+                expected_result = [_step_dict(step) for step in steps_list]
+                self.assertListEqual(steps, expected_result)
+                result = count_steps_not_stopped(self.wfm_db_mock, steps, forced,
+                                                 self.job_manager.name, self.job_mgr_commands)
+                self.assertEqual(result, expected_count)
+
+
+class TestGetSessionStepFromName(NameIndexTestCase, RollbackDBTestCase):
     """ Test that the function get_session_step_from_name behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+        """Set up the tests by filling the mock WFM database.
         Doing this because one of the tests adds elements to the DB.
         """
-        self.wfm_db_mock = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.wfm_db_mock.engine)
+        super().setUp()
 
         # Define 1 session with a single step
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         self.session1 = Session(name=session_name, workflow_name="wkf1",
                                 start_time=0, end_time=0, status="status1")
         self.stepd1 = StepDescription(session_id=self.session1, name='step1', command='command1')
@@ -3386,12 +3229,8 @@ class TestGetSessionStepFromName(unittest.TestCase):
         self.session1.step_descriptions = [self.stepd1]
         self.stepd1.steps = [self.step1]
 
-        self.wfm_db_mock.dbsession.add(self.session1)
-        self.wfm_db_mock.dbsession.add(self.stepd1)
-        self.wfm_db_mock.dbsession.add(self.step1)
-
         # Define another session with a 2 steps
-        session_name = f"ses{next(session_index)}"
+        session_name = f"ses{next(self._idx)}"
         self.session2 = Session(name=session_name, workflow_name="wkf2",
                                 start_time=0, end_time=0, status="status2")
         self.stepd2 = StepDescription(session_id=self.session2, name='step2', command='command2')
@@ -3404,30 +3243,9 @@ class TestGetSessionStepFromName(unittest.TestCase):
         self.session2.step_descriptions = [self.stepd2]
         self.stepd2.steps = [self.step20, self.step21]
 
-        self.wfm_db_mock.dbsession.add(self.session2)
-        self.wfm_db_mock.dbsession.add(self.stepd2)
-        self.wfm_db_mock.dbsession.add(self.step20)
-        self.wfm_db_mock.dbsession.add(self.step21)
-
+        self.wfm_db_mock.dbsession.add_all([self.session1, self.stepd1, self.step1,
+                                            self.session2, self.stepd2, self.step20, self.step21])
         self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.refresh(self.step1)
-        self.wfm_db_mock.dbsession.refresh(self.stepd1)
-        self.wfm_db_mock.dbsession.refresh(self.session1)
-        self.wfm_db_mock.dbsession.refresh(self.step20)
-        self.wfm_db_mock.dbsession.refresh(self.step21)
-        self.wfm_db_mock.dbsession.refresh(self.stepd2)
-        self.wfm_db_mock.dbsession.refresh(self.session2)
-
-    def tearDown(self):
-        self.wfm_db_mock.dbsession.delete(self.session1)
-        self.wfm_db_mock.dbsession.delete(self.stepd1)
-        self.wfm_db_mock.dbsession.delete(self.step1)
-        self.wfm_db_mock.dbsession.delete(self.session2)
-        self.wfm_db_mock.dbsession.delete(self.stepd2)
-        self.wfm_db_mock.dbsession.delete(self.step20)
-        self.wfm_db_mock.dbsession.delete(self.step21)
-        self.wfm_db_mock.dbsession.commit()
-        self.wfm_db_mock.dbsession.close()
 
     def test_get_session_step_from_name_no_session(self):
         """Tests that getting steps info from session name and step name
@@ -3464,12 +3282,7 @@ class TestGetSessionStepFromName(unittest.TestCase):
         for this session in the DB"""
         result = get_session_step_from_name(self.wfm_db_mock,
                                             self.session1.name, self.stepd1.name)
-        expected_result = [{'id': self.step1.id,
-                            'instance_name': self.step1.instance_name,
-                            'status': self.step1.status,
-                            'progress': self.step1.progress,
-                            'jobid': self.step1.jobid,
-                            'step_description_id': self.stepd1.id}]
+        expected_result = [_step_dict(self.step1)]
         self.assertListEqual(result, expected_result)
 
     def test_get_session_step_from_name_several_steps(self):
@@ -3478,14 +3291,7 @@ class TestGetSessionStepFromName(unittest.TestCase):
         for this session in the DB"""
         result = get_session_step_from_name(self.wfm_db_mock,
                                             self.session2.name, self.stepd2.name)
-        expected_result = [{'id': self.step20.id, 'status': self.step20.status,
-                            'progress': self.step20.progress,
-                            'instance_name': self.step20.instance_name,
-                            'jobid': self.step20.jobid, 'step_description_id': self.stepd2.id},
-                           {'id': self.step21.id, 'status': self.step21.status,
-                            'progress': self.step21.progress,
-                            'instance_name': self.step21.instance_name,
-                            'jobid': self.step21.jobid, 'step_description_id': self.stepd2.id}]
+        expected_result = [_step_dict(self.step20), _step_dict(self.step21)]
         self.assertListEqual(result, expected_result)
 
 
@@ -3501,16 +3307,15 @@ class TestCheckRemoveFile(unittest.TestCase):
 
     def test_remove_file_known(self):
         """Tests that remove_file behaves as expected for an existing file"""
-        # Create a temporary file
-        directory = tempfile.mkdtemp()
-        fname = os.path.join(directory, "MY_FILE_TO_REMOVE")
-        open(fname, 'w').close()
-        result = os.path.isfile(fname)
-        self.assertTrue(result)
-        remove_file(fname)
-        result = os.path.isfile(fname)
-        self.assertFalse(result)
-        os.rmdir(directory)
+        # Create a temporary file (the directory is removed even if an assertion fails)
+        with tempfile.TemporaryDirectory(dir=TMP_ROOT) as directory:
+            fname = os.path.join(directory, "MY_FILE_TO_REMOVE")
+            Path(fname).touch()
+            result = os.path.isfile(fname)
+            self.assertTrue(result)
+            remove_file(fname)
+            result = os.path.isfile(fname)
+            self.assertFalse(result)
 
 
 class TestCheckIsAbsPathName(unittest.TestCase):
@@ -3521,7 +3326,7 @@ class TestCheckIsAbsPathName(unittest.TestCase):
         a 0 length directory name"""
         directory = ""
         result = check_isabspathname(directory)
-        expected_result = "is not a correct directory name"
+        expected_result = ERR_NAME
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathname_len1(self):
@@ -3529,7 +3334,7 @@ class TestCheckIsAbsPathName(unittest.TestCase):
         a 1 char length directory name"""
         directory = "/"
         result = check_isabspathname(directory)
-        expected_result = "is not a correct directory name"
+        expected_result = ERR_NAME
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathname_not_absolute(self):
@@ -3537,7 +3342,7 @@ class TestCheckIsAbsPathName(unittest.TestCase):
         a directory that is not an absolute path"""
         directory = "tmp"
         result = check_isabspathname(directory)
-        expected_result = "is not an absolute pathname"
+        expected_result = ERR_NOT_ABS
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathname_dir_ok(self):
@@ -3553,12 +3358,37 @@ class TestCheckIsAbsPathName(unittest.TestCase):
 class TestCheckIsAbsPathDir(unittest.TestCase):
     """ Test that the function check_isabspathdir behaves as expected.
     """
+    # Access rights of the temporary directories used by the tests
+    DIRECTORIES_MODES = {'not_readable': 0o300, 'not_writable': 0o500,
+                         'not_executable': 0o600, 'ok': 0o700}
+
+    @classmethod
+    def setUpClass(cls):
+        """Create once the temporary directories (one per access rights) and the temporary
+        file used by the tests.
+        """
+        cls.base_directory = tempfile.mkdtemp(dir=TMP_ROOT)
+        cls.directories = {}
+        for name, mode in cls.DIRECTORIES_MODES.items():
+            cls.directories[name] = os.path.join(cls.base_directory, name)
+            os.mkdir(cls.directories[name])
+            os.chmod(cls.directories[name], mode)
+        cls.tmpfp = tempfile.NamedTemporaryFile(dir=cls.base_directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        # Closing it automatically deletes the temporary file
+        cls.tmpfp.close()
+        for directory in cls.directories.values():
+            os.chmod(directory, 0o700)
+        rmtree(cls.base_directory, ignore_errors=True)
+
     def test_check_isabspathdir_len0(self):
         """Tests that check_isabspathdir behaves as expected for
         a 0 length directory name"""
         directory = ""
         result = check_isabspathdir(directory)
-        expected_result = "is not a correct directory name"
+        expected_result = ERR_NAME
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_len1(self):
@@ -3566,7 +3396,7 @@ class TestCheckIsAbsPathDir(unittest.TestCase):
         a 1 char length directory name"""
         directory = "/"
         result = check_isabspathdir(directory)
-        expected_result = "is not a correct directory name"
+        expected_result = ERR_NAME
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_not_absolute(self):
@@ -3574,7 +3404,7 @@ class TestCheckIsAbsPathDir(unittest.TestCase):
         a directory that is not an absolute path"""
         directory = "tmp"
         result = check_isabspathdir(directory)
-        expected_result = "is not an absolute pathname"
+        expected_result = ERR_NOT_ABS
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_not_existing(self):
@@ -3582,64 +3412,43 @@ class TestCheckIsAbsPathDir(unittest.TestCase):
         a directory that does not exist"""
         directory = "/UNKNOWN"
         result = check_isabspathdir(directory)
-        expected_result = "is not a directory or does not exist"
+        expected_result = ERR_NOT_DIR
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_file(self):
         """Tests that check_isabspathdir behaves as expected for
         a directory that is a file name"""
-        # Create a temporary file
-        tmpfp = tempfile.NamedTemporaryFile()
-        tmpfp.write(b"This is my temporary file")
-        directory = tmpfp.name
-        self.assertEqual(os.path.exists(directory), True)
+        # The temporary file exists as long as it is open
+        directory = self.tmpfp.name
         result = check_isabspathdir(directory)
-        # Closing it automatically deletes the temporary file
-        tmpfp.close()
-        expected_result = "is not a directory or does not exist"
+        expected_result = ERR_NOT_DIR
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_dir_not_readable(self):
         """Tests that check_isabspathdir behaves as expected for
         a directory that is not readable"""
-        # Create a temporary directory
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o300)
-        result = check_isabspathdir(directory)
-        os.rmdir(directory)
-        expected_result = "cannot be accessed"
+        result = check_isabspathdir(self.directories['not_readable'])
+        expected_result = ERR_ACCESS
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_dir_not_writable(self):
         """Tests that check_isabspathdir behaves as expected for
         a directory that is not writable"""
-        # Create a temporary directory
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o500)
-        result = check_isabspathdir(directory)
-        os.rmdir(directory)
-        expected_result = "cannot be accessed"
+        result = check_isabspathdir(self.directories['not_writable'])
+        expected_result = ERR_ACCESS
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_dir_not_executable(self):
         """Tests that check_isabspathdir behaves as expected for
         a directory that is not executable"""
-        # Create a temporary directory
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o600)
-        result = check_isabspathdir(directory)
-        os.rmdir(directory)
-        expected_result = "cannot be accessed"
+        result = check_isabspathdir(self.directories['not_executable'])
+        expected_result = ERR_ACCESS
         self.assertEqual(result, expected_result)
 
     def test_check_isabspathdir_dir_ok(self):
         """Tests that check_isabspathdir behaves as expected for
         a directory that fulfills all conditions"""
-        # Create a temporary directory
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o700)
-        result = check_isabspathdir(directory)
-        os.rmdir(directory)
+        result = check_isabspathdir(self.directories['ok'])
         expected_result = ""
         self.assertEqual(result, expected_result)
 
@@ -3647,205 +3456,100 @@ class TestCheckIsAbsPathDir(unittest.TestCase):
 class TestGetNewestFile(unittest.TestCase):
     """ Test that the function get_newest_file behaves as expected.
     """
+    @classmethod
+    def setUpClass(cls):
+        """Create once the temporary directories used by the tests:
+        an empty one and one containing some files.
+        """
+        cls.base_directory = tempfile.mkdtemp(dir=TMP_ROOT)
+        cls.empty_directory = os.path.join(cls.base_directory, 'empty')
+        os.mkdir(cls.empty_directory, 0o700)
+        cls.files_directory = os.path.join(cls.base_directory, 'files')
+        os.mkdir(cls.files_directory, 0o700)
+        cls.files = [_touch(cls.files_directory, name) for name in ('oldest', 'middle', 'newest')]
+        # Files change times, from the oldest to the newest one
+        cls.ctimes = {fname: 1000.0 + idx for idx, fname in enumerate(cls.files)}
+
+    @classmethod
+    def tearDownClass(cls):
+        # The tree content is known: remove it explicitly rather than walking it
+        os.chmod(cls.files_directory, 0o700)
+        for fname in cls.files:
+            os.unlink(fname)
+        for directory in (cls.files_directory, cls.empty_directory, cls.base_directory):
+            os.rmdir(directory)
+
     def test_get_newest_file_empty_dir(self):
         """Tests that get_newest_file behaves as expected for
         an empty directory"""
-        # Create a temporary directory
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o700)
-        result = get_newest_file(directory)
-        os.rmdir(directory)
+        result = get_newest_file(self.empty_directory)
         expected_result = ""
         self.assertEqual(result, expected_result)
 
     def test_get_newest_file_dir_not_readable(self):
         """Tests that get_newest_file behaves as expected for
         a directory that is not readable"""
-        # Create a temporary directory and some files in it
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o700)
-        oldest = tempfile.mkstemp(dir=directory)
-        time.sleep(2)
-        middle = tempfile.mkstemp(dir=directory)
-        time.sleep(2)
-        newest = tempfile.mkstemp(dir=directory)
-        os.chmod(directory, 0o200)
-        result = get_newest_file(directory)
-        os.chmod(directory, 0o700)
-        rmtree(directory, ignore_errors=True)
+        os.chmod(self.files_directory, 0o200)
+        # The directory is shared by the class tests: give its permissions back even on failure
+        self.addCleanup(os.chmod, self.files_directory, 0o700)
+        result = get_newest_file(self.files_directory)
         expected_result = ""
         self.assertEqual(result, expected_result)
 
     def test_get_newest_file_dir_not_empty(self):
         """Tests that get_newest_file behaves as expected for
         a directory that is not empty"""
-        # Create a temporary directory and some files in it
-        directory = tempfile.mkdtemp()
-        os.chmod(directory, 0o700)
-        oldest = tempfile.mkstemp(dir=directory)
-        time.sleep(2)
-        middle = tempfile.mkstemp(dir=directory)
-        time.sleep(2)
-        newest = tempfile.mkstemp(dir=directory)
-        result = get_newest_file(directory)
-        rmtree(directory, ignore_errors=True)
-        expected_result = newest[1]
+        # The change time of a file cannot be set (os.utime only sets the access and modification
+        # times): fake it rather than waiting between the files creations
+        with patch('os.path.getctime', side_effect=self.ctimes.get):
+            result = get_newest_file(self.files_directory)
+        expected_result = self.files[-1]
         self.assertEqual(result, expected_result)
 
 
 class TestIsHestiaPath(unittest.TestCase):
     """ Test that the function is_hestia_path behaves as expected.
     """
-    def test_is_hestia_path_empty_str(self):
-        """Tests that is_hestia_path behaves as expected for
-        an empty input string"""
-        res_bool, res_str = is_hestia_path('')
-        self.assertEqual(res_bool, False)
-
-    def test_is_hestia_path_no_hestia_prefix(self):
-        """Tests that is_hestia_path behaves as expected for
-        an input string with a prefix != HESTIA@"""
-        res_bool, res_str = is_hestia_path('XXX@YYY')
-        self.assertEqual(res_bool, False)
-
-    def test_is_hestia_path_abs_path(self):
-        """Tests that is_hestia_path behaves as expected for
-        an input string with a prefix = HESTIA@"""
-        res_bool, res_str = is_hestia_path('HESTIA@YYY')
-        self.assertEqual(res_bool, True)
-        self.assertEqual(res_str, 'YYY')
+    def test_is_hestia_path(self):
+        """Tests that is_hestia_path behaves as expected for an empty input string
+        and for input strings with a prefix != or = HESTIA@"""
+        # (input string, expected result): the path is returned unchanged without prefix
+        cases = [('', (False, '')),
+                 ('XXX@YYY', (False, 'XXX@YYY')),
+                 ('HESTIA@YYY', (True, 'YYY'))]
+        for input_string, expected_result in cases:
+            with self.subTest(input_string=input_string):
+                self.assertEqual(is_hestia_path(input_string), expected_result)
 
 
 class TestCheckIsSize(unittest.TestCase):
     """ Test that the function check_issize behaves as expected.
     """
-    def test_check_issize_len0(self):
+    # (size, expected result) pairs
+    CASES = (("", ERR_SIZE),            # 0 length string
+             ("G123", ERR_SIZE),        # does not begin with a number
+             ("123A", ERR_SIZE),        # incorrect unit on one char
+             ("123Kb", ERR_SIZE),       # incorrect unit on 2 chars
+             ("123", ""),               # only a number
+             ("123K", ""),
+             ("123M", ""),
+             ("123G", ""),
+             ("123T", ""),
+             ("123Ki", ""),
+             ("123Mi", ""),
+             ("123Gi", ""),
+             ("123GiB", ""),
+             ("123Ti", ""),
+             ("123 T", ERR_SIZE),       # correct unit on one char separated by a space
+             ("123 Ab", ERR_SIZE))      # unit on 2 chars separated by a space
+
+    def test_check_issize(self):
         """Tests that check_issize behaves as expected for
-        a 0 length string"""
-        size = ""
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_no_num(self):
-        """Tests that check_issize behaves as expected for
-        a string that does not begin with a number"""
-        size = "G123"
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_incorrect_unit1(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains an incorrect unit on one char"""
-        size = "123A"
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_incorrect_unit2(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains an incorrect unit on 2 chars"""
-        size = "123Kb"
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_no_unit(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains only a number"""
-        size = "123"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_K(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (K)"""
-        size = "123K"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_M(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (M)"""
-        size = "123M"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_G(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (G)"""
-        size = "123G"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_T(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (T)"""
-        size = "123T"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_Ki(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (Ki)"""
-        size = "123Ki"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_Mi(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (Mi)"""
-        size = "123Mi"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_Gi(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (Gi)"""
-        size = "123Gi"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_Gi(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (Gi)"""
-        size = "123GiB"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit_Ti(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char (Ti)"""
-        size = "123Ti"
-        result = check_issize(size)
-        expected_result = ""
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit1_space(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on one char separated by a space"""
-        size = "123 T"
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
-
-    def test_check_issize_unit2_space(self):
-        """Tests that check_issize behaves as expected for
-        a string that contains a correct unit on 2 chars separated by a space"""
-        size = "123 Ab"
-        result = check_issize(size)
-        expected_result = "is not a correct size format"
-        self.assertEqual(result, expected_result)
+        correct and incorrect size formats"""
+        for size, expected_result in self.CASES:
+            with self.subTest(size=size):
+                result = check_issize(size)
+                self.assertEqual(result, expected_result)
 
 
 class TestSetupSessionFields(unittest.TestCase):
@@ -3862,109 +3566,52 @@ class TestSetupSessionFields(unittest.TestCase):
 class TestSetupServiceFields(unittest.TestCase):
     """ Test that the function setup_service_fields behaves as expected.
     """
-    def test_setup_service_fields_no_service(self):
-        """Tests that setup_service_fields behaves as expected when
-        the list of services is empty
-        """
-        services = []
-        result = setup_service_fields(services)
-        expected_result = {
-            'name': 'UNKNOWN',
-            'type': 'UNKNOWN',
-            'status': 'UNKNOWN',
-            'jobid': 0
-        }
-        self.assertEqual(result, expected_result)
-
-    def test_setup_service_fields_single_service(self):
+    def test_setup_service_fields(self):
         """Tests that setup_service_fields behaves as expected when
-        the list of services contains a single element
+        the list of services is empty, contains a single element or 2 elements
         """
-        services = [ {
-            'name': 'name0',
-            'type': 'TYPE0',
-            'status': 'status0',
-            'jobid': 123
-        } ]
-        result = setup_service_fields(services)
-        expected_result = {
+        service0 = {
             'name': 'name0',
             'type': 'TYPE0',
             'status': 'status0',
             'jobid': 123
         }
-        self.assertEqual(result, expected_result)
-
-    def test_setup_service_fields_two_services(self):
-        """Tests that setup_service_fields behaves as expected when
-        the list of services contains 2 elements
-        """
-        services = [ {
-            'name': 'name0',
-            'type': 'TYPE0',
-            'status': 'status0',
-            'jobid': 123
-        }, {
+        service1 = {
             'name': 'name1',
             'type': 'TYPE1',
             'status': 'status1',
             'jobid': 456
-        } ]
-        result = setup_service_fields(services)
-        expected_result = {
-            'name': 'name0',
-            'type': 'TYPE0',
-            'status': 'status0',
-            'jobid': 123
         }
-        self.assertEqual(result, expected_result)
+        unknown_service = {
+            'name': 'UNKNOWN',
+            'type': 'UNKNOWN',
+            'status': 'UNKNOWN',
+            'jobid': 0
+        }
+        # (case, services, expected result)
+        cases = [('no service', [], unknown_service),
+                 ('single service', [service0], service0),
+                 ('two services', [service0, service1], service0)]
+        for case, services, expected_result in cases:
+            with self.subTest(case=case):
+                result = setup_service_fields(services)
+                self.assertEqual(result, expected_result)
 
 
 class TestSetupStepsFields(unittest.TestCase):
     """ Test that the function setup_steps_fields behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+    @classmethod
+    def setUpClass(cls):
+        """Set up once the job manager settings shared by the tests.
         """
-        test_config = Path(__file__).parent.absolute() / "test_data" / "slurm_settings.yaml"
-        api_settings = WFMSettings.from_yaml(test_config)
-        self.job_mgr_commands = api_settings.command
-        self.job_manager = api_settings.jobmanager
+        api_settings = _load_settings(SLURM_SETTINGS_YAML)
+        cls.job_mgr_commands = api_settings.command
+        cls.job_manager = api_settings.jobmanager
 
-    def test_setup_steps_fields_no_step(self):
+    def test_setup_steps_fields(self):
         """Tests that setup_steps_fields behaves as expected when
-        the list of steps is empty
-        """
-        stepd = {
-            'id': 0,
-            'session_id': 1,
-            'service_id': 2,
-            'name': 'name0',
-            'command': 'command0'
-        }
-        step_list = []
-        service = {
-            'name': 'name1',
-            'type': 'TYPE0',
-            'targets': 'target0',
-            'status': 'status0',
-            'jobid': 123
-        }
-        result = setup_steps_fields(stepd, step_list, service,
-                                    self.job_manager.name, self.job_mgr_commands)
-        expected_result = [ {
-            'name': stepd['name'],
-            'status': 'INACTIVE',
-            'progress': "",
-            'jobid': 0,
-            'command': stepd['command'],
-            'service': service
-        } ]
-        self.assertListEqual(result, expected_result)
-
-    def test_setup_steps_fields_two_steps(self):
-        """Tests that setup_steps_fields behaves as expected when
-        the list of steps contains 2 steps
+        the list of steps is empty or contains 2 steps
         """
         stepd = {
             'id': 0,
@@ -3988,31 +3635,45 @@ class TestSetupStepsFields(unittest.TestCase):
             'jobid': 456,
             'step_description_id': 0
         } ]
-        service = {
+        service1 = {
+            'name': 'name1',
+            'type': 'TYPE0',
+            'targets': 'target0',
+            'status': 'status0',
+            'jobid': 123
+        }
+        service2 = {
             'name': 'name2',
             'type': 'TYPE2',
             'targets': 'target2',
             'status': 'status2',
             'jobid': 789
         }
-        result = setup_steps_fields(stepd, step_list, service,
-                                    self.job_manager.name, self.job_mgr_commands)
-        expected_result = [ {
-            'name': step_list[0]['instance_name'],
-            'status': step_list[0]['status'],
-            'progress': step_list[0]['progress'],
-            'jobid': step_list[0]['jobid'],
-            'command': stepd['command'],
-            'service': service
-        }, {
-            'name': step_list[1]['instance_name'],
-            'status': step_list[1]['status'],
-            'progress': step_list[1]['progress'],
-            'jobid': step_list[1]['jobid'],
+        # An empty list of steps reports the step description as inactive
+        inactive_steps = [ {
+            'name': stepd['name'],
+            'status': 'INACTIVE',
+            'progress': "",
+            'jobid': 0,
             'command': stepd['command'],
-            'service': service
+            'service': service1
         } ]
-        self.assertListEqual(result, expected_result)
+        steps = [ {
+            'name': step['instance_name'],
+            'status': step['status'],
+            'progress': step['progress'],
+            'jobid': step['jobid'],
+            'command': stepd['command'],
+            'service': service2
+        } for step in step_list ]
+        # (case, step description, steps, service, expected result)
+        cases = [('no step', stepd, [], service1, inactive_steps),
+                 ('two steps', stepd, step_list, service2, steps)]
+        for case, step_description, steps_list, service, expected_result in cases:
+            with self.subTest(case=case):
+                result = setup_steps_fields(step_description, steps_list, service,
+                                            self.job_manager.name, self.job_mgr_commands)
+                self.assertListEqual(result, expected_result)
 
 
 if __name__ == "__main__":
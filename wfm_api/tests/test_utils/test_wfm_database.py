@@ -1,41 +1,121 @@
 """Unit tests for the WFM database methodes.
 """
+import tempfile
+import unittest
+from typing import Any, Dict, List, Tuple
 
-from sqlalchemy.sql import text
+from sqlalchemy import bindparam, inspect, select, text
 
-import unittest
-from tests.test_utils import TEST_DATABASE
-from wfm_api.utils.database.wfm_database import WFMDatabase
-from wfm_api.utils.database.wfm_database import Session, Service, Base
+from wfm_api.utils.database.wfm_database import Session, Service
 from wfm_api.utils.database.wfm_database import Step, StepDescription
 from wfm_api.utils.database.wfm_database import ObjectActivityLogging
-from wfm_api.utils.database.wfm_database import NamespaceLock
+from wfm_api.utils.database.wfm_database import NamespaceLock, WFMDatabase
 from wfm_api.utils.errors import UnexistingSessionNameError
 from wfm_api.utils.errors import UnexistingServiceNameError, NoDocumentError, NoUniqueDocumentError
 
+from tests.test_utils import RollbackDBTestCase, SharedDBTestCase
+
+
+# Activity log fields the tests can check (the activity time is not controlled)
+LOG_FIELDS = ('object_type', 'object_id', 'activity')
+LOG_COLUMNS = tuple(getattr(ObjectActivityLogging, field) for field in LOG_FIELDS)
+# Checkable fields of the activity logs of an object, built once for all the tests
+OBJECT_LOG_QUERY = select(*LOG_COLUMNS).where(
+    ObjectActivityLogging.object_type == bindparam('object_type'),
+    ObjectActivityLogging.object_id == bindparam('object_id'))
+
+
+# Service columns checked after an update, in the order of the expected tuples
+SERVICE_COLUMNS = (Service.id, Service.session_id, Service.name, Service.service_type,
+                   Service.location, Service.targets, Service.status, Service.jobid)
+
+
+def _log_fields(log: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the checkable fields of an activity log.
+    """
+    return {field: log[field] for field in LOG_FIELDS}
+
+
+def _services_rows(dbsession: Any, name: str) -> List[Tuple[Any, ...]]:
+    """Returns the SERVICE_COLUMNS of the services with a given name, ordered by id.
+    The rows are read as plain tuples, without loading Service objects.
+    """
+    query = select(*SERVICE_COLUMNS).where(Service.name == name).order_by(Service.id)
+    return dbsession.execute(query).all()
 
-class TestWFMDatabase(unittest.TestCase):
+
+def _store_sessions_services(dbsession: Any) -> Tuple[List[Session], List[Service]]:
+    """Stores the s1 and s2 sessions, each one with a service (e1 and e2).
+
+    Args:
+        dbsession (Any): The DB session to store them with.
+
+    Returns:
+        Tuple[List[Session], List[Service]]: The stored sessions and services.
+    """
+    sessions = [Session(name=name, workflow_name='test1', user_name='user',
+                        start_time=0, end_time=0, status='starting')
+                for name in ('s1', 's2')]
+    dbsession.bulk_save_objects(sessions, return_defaults=True)
+    services = [Service(name=f"e{idx}", session_id=session.id, service_type='SBB',
+                        location=f"location{idx}", targets=f"/target{idx}",
+                        flavor=f"flavor{idx}", datanodes=idx, start_time=0, end_time=0,
+                        status=f"status{idx}", jobid=idx)
+                for idx, session in enumerate(sessions, start=1)]
+    dbsession.bulk_save_objects(services, return_defaults=True)
+    dbsession.commit()
+    return sessions, services
+
+
+def _store_step_descriptions(dbsession: Any) -> Tuple[List[Session], List[StepDescription]]:
+    """Stores the s1 and s2 sessions with their service (see _store_sessions_services),
+    and an "a" step description using it in each session.
+
+    Args:
+        dbsession (Any): The DB session to store them with.
+
+    Returns:
+        Tuple[List[Session], List[StepDescription]]: The stored sessions and step descriptions.
+    """
+    sessions, services = _store_sessions_services(dbsession)
+    step_descriptions = [StepDescription(name='a', session_id=service.session_id,
+                                         command=f"command{idx}", service_id=service.id)
+                         for idx, service in enumerate(services, start=1)]
+    dbsession.bulk_save_objects(step_descriptions, return_defaults=True)
+    dbsession.commit()
+    return sessions, step_descriptions
+
+
+class TestWFMDatabase(RollbackDBTestCase):
     """Tests that the manipulation of the sqlite database behaves as expected.
     """
 
     def setUp(self):
-        """Connect to database for tests.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-    def tearDown(self):
-        """Close database after tests.
+        """Set up the tests by filling the mock WFM database with 2 sessions,
+        each one with a service.
         """
-        self.db_test.dbsession.close()
+        super().setUp()
+        self.db_test = self.wfm_db_mock
+
+        sessions, services = _store_sessions_services(self.db_test.dbsession)
+        self.ses_ids = [session.id for session in sessions]
+        # Expected information of the stored sessions and services
+        self.sessions_info = [
+            {'id': session.id, 'workflow_name': 'test1', 'name': session.name,
+             'start_time': 0, 'end_time': 0, 'status': 'starting'}
+            for session in sessions]
+        self.services_info = [
+            {'id': service.id, 'session_id': service.session_id, 'name': service.name,
+             'type': service.service_type, 'location': service.location,
+             'targets': service.targets, 'status': service.status, 'jobid': service.jobid}
+            for service in services]
 
     def test_get_session_info_from_name_no_workflow(self):
         """Tests that getting all the rows from a Session table
            with a specific session name and no workflow name behaves as expected
         """
         session_name = 's1'
-        expected_list = [
-            {'id': 1, 'workflow_name': 'test1', 'name': 's1',
-             'start_time': 0, 'end_time': 0, 'status': 'starting'}]
+        expected_list = self.sessions_info[:1]
         result = self.db_test.get_session_info_from_name(sname=session_name)
         self.assertListEqual(result, expected_list)
 
@@ -45,9 +125,7 @@ class TestWFMDatabase(unittest.TestCase):
         """
         session_name = 's1'
         workflow_name = 'test1'
-        expected_list = [
-            {'id': 1, 'workflow_name': workflow_name, 'name': session_name,
-             'start_time': 0, 'end_time': 0, 'status': 'starting'}]
+        expected_list = self.sessions_info[:1]
         result = self.db_test.get_session_info_from_name(sname=session_name,
                                                          wname=workflow_name)
         self.assertListEqual(result, expected_list)
@@ -63,11 +141,7 @@ class TestWFMDatabase(unittest.TestCase):
 
     def test_get_all_services(self):
         """Tests that getting all the rows from a Service table behaves as expected"""
-        expected_list = [
-            {'id': 1, 'session_id': 1, 'name': 'e1', 'type': 'SBB', 'location': 'location1',
-             'targets': '/target1', 'status': 'status1', 'jobid': 1},
-            {'id': 2, 'session_id': 2, 'name': 'e2', 'type': 'SBB', 'location': 'location2',
-             'targets': '/target2', 'status': 'status2', 'jobid': 2}]
+        expected_list = self.services_info
         result = self.db_test.get_all_services()
         self.assertListEqual(result, expected_list)
 
@@ -76,26 +150,16 @@ class TestWFMDatabase(unittest.TestCase):
            with a specific name behaves as expected
         """
         service_name = 'e1'
-        expected_list = [
-            {'id': 1, 'session_id': 1, 'name': 'e1', 'type': 'SBB', 'location': 'location1',
-             'targets': '/target1', 'status': 'status1', 'jobid': 1}]
+        expected_list = self.services_info[:1]
         result = self.db_test.get_service_info_from_name(service_name)
         self.assertListEqual(result, expected_list)
 
 
-class TestAddUniqueSession(unittest.TestCase):
+class TestAddUniqueSession(SharedDBTestCase):
     """ Test that the function add_unique_session behaves as expected.
     """
-    def setUp(self):
-        """Connect to database for tests.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored sessions (see __init__.py)
-        self.ids = [ 1, 2 ]
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
+    # ids of the already stored sessions (see __init__.py)
+    ids = [ 1, 2 ]
 
     def test_add_unique_session_unexisting_session(self):
         """Tests that adding a not yet existing session behaves as expected"""
@@ -105,17 +169,14 @@ class TestAddUniqueSession(unittest.TestCase):
                                                      123, 'starting')
         self.assertNotIn(result_add, self.ids)
         # Check that we generated a log into the DB
-        query = f"object_type == 'session' AND object_id == {result_add}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
+        # one() fails if there is not exactly one log
+        log = self.db_test.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'session', 'object_id': result_add}).one()._asdict()
         expected_result = {'id': 1, 'object_type': 'session',
                             'object_id': result_add, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
+        # we do this instead of assertDictEqual because the id might not be '1' since we already
         # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(log), _log_fields(expected_result))
 
     def test_add_unique_session_existing_session(self):
         """Tests that adding an already existing session behaves as expected"""
@@ -123,20 +184,12 @@ class TestAddUniqueSession(unittest.TestCase):
         self.assertEqual(result, 1)
 
 
-class TestAddSession(unittest.TestCase):
+class TestAddSession(SharedDBTestCase):
     """ Test that the function add_session behaves as expected.
     """
-    def setUp(self):
-        """Connect to database for tests.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored sessions (see __init__.py)
-        self.ids = [ 1, 2 ]
-        self.unexisting_wfname = 'unexisting_wfname'
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
+    # ids of the already stored sessions (see __init__.py)
+    ids = [ 1, 2 ]
+    unexisting_wfname = 'unexisting_wfname'
 
     def test_add_session_unexisting_session(self):
         """Tests that adding a not yet existing session behaves as expected"""
@@ -144,17 +197,14 @@ class TestAddSession(unittest.TestCase):
                                               123, 'starting')
         self.assertNotIn(result_add, self.ids)
         # Check that we generated a log into the DB
-        query = f"object_type == 'session' AND object_id == {result_add}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
+        # one() fails if there is not exactly one log
+        log = self.db_test.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'session', 'object_id': result_add}).one()._asdict()
         expected_result = {'id': 1, 'object_type': 'session',
                             'object_id': result_add, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
+        # we do this instead of assertDictEqual because the id might not be '1' since we already
         # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(log), _log_fields(expected_result))
 
     def test_add_session_existing_session(self):
         """Tests that adding an already existing session behaves as expected"""
@@ -167,18 +217,14 @@ class TestAddSession(unittest.TestCase):
         self.assertNotEqual(result2, result1)
 
 
-class TestGetAllSessions(unittest.TestCase):
+class TestGetAllSessions(RollbackDBTestCase):
     """ Test that the function get_all_sessions behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests expects an empty DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
     def test_get_all_sessions_from_empty_db(self):
         """Tests that getting all sessions behaves as expected when
@@ -195,7 +241,6 @@ class TestGetAllSessions(unittest.TestCase):
                            start_time=123, end_time=123, status='starting')
         self.db_test_priv.dbsession.add(session1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
         expected_result = [{'id': session1.id, 'name': 'ses1', 'workflow_name': 'wkf1',
                             'start_time': 123, 'end_time': 123, 'status': 'starting'}]
         result = self.db_test_priv.get_all_sessions()
@@ -209,11 +254,8 @@ class TestGetAllSessions(unittest.TestCase):
                            start_time=123, end_time=123, status='starting')
         session2 = Session(name='session2', workflow_name='wkf1', user_name='user',
                            start_time=456, end_time=456, status='running')
-        self.db_test_priv.dbsession.add(session1)
-        self.db_test_priv.dbsession.add(session2)
+        self.db_test_priv.dbsession.bulk_save_objects([session1, session2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
-        self.db_test_priv.dbsession.refresh(session2)
 
         expected_result = [
                 {'id': session1.id, 'workflow_name': 'wkf1', 'name': 'session1',
@@ -230,11 +272,8 @@ class TestGetAllSessions(unittest.TestCase):
                            start_time=123, end_time=123, status='starting')
         session2 = Session(name='session1', workflow_name='wkf1', user_name='user1',
                            start_time=123, end_time=123, status='starting')
-        self.db_test_priv.dbsession.add(session1)
-        self.db_test_priv.dbsession.add(session2)
+        self.db_test_priv.dbsession.bulk_save_objects([session1, session2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
-        self.db_test_priv.dbsession.refresh(session2)
         expected_result = [
                 {'id': session2.id, 'workflow_name': 'wkf1', 'name': 'session1',
                  'start_time': 123, 'end_time': 123, 'status': 'starting'}
@@ -245,40 +284,36 @@ class TestGetAllSessions(unittest.TestCase):
         self.assertListEqual(result, [])
 
 
-class TestGetSessionInfoFromName(unittest.TestCase):
+class TestGetSessionInfoFromName(RollbackDBTestCase):
     """ Test that the function get_session_info_from_name behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
-        session1 = Session(name='ses1', workflow_name='wkf1', user_name='user',
-                           start_time=123, end_time=123, status='status1')
-        session2 = Session(name='ses1', workflow_name='wkf1', user_name='user',
-                           start_time=321, end_time=321, status='status2')
-        session3 = Session(name='ses2', workflow_name='wkf1', user_name='user',
-                           start_time=456, end_time=456, status='status3')
-        session4 = Session(name='ses1', workflow_name='wkf4', user_name='user',
-                           start_time=789, end_time=789, status='status4')
-        self.db_test_priv.dbsession.add(session1)
-        self.db_test_priv.dbsession.add(session2)
-        self.db_test_priv.dbsession.add(session3)
-        self.db_test_priv.dbsession.add(session4)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
-        self.db_test_priv.dbsession.refresh(session2)
-        self.db_test_priv.dbsession.refresh(session3)
-        self.db_test_priv.dbsession.refresh(session4)
-        self.ses_id1 = session1.id
-        self.ses_id2 = session2.id
-        self.ses_id3 = session3.id
-        self.ses_id4 = session4.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        sessions = [
+            {'name': 'ses1', 'workflow_name': 'wkf1', 'user_name': 'user',
+             'start_time': 123, 'end_time': 123, 'status': 'status1'},
+            {'name': 'ses1', 'workflow_name': 'wkf1', 'user_name': 'user',
+             'start_time': 321, 'end_time': 321, 'status': 'status2'},
+            {'name': 'ses2', 'workflow_name': 'wkf1', 'user_name': 'user',
+             'start_time': 456, 'end_time': 456, 'status': 'status3'},
+            {'name': 'ses1', 'workflow_name': 'wkf4', 'user_name': 'user',
+             'start_time': 789, 'end_time': 789, 'status': 'status4'}]
+        self.db_test_priv.dbsession.execute(Session.__table__.insert(), sessions)
+        self.db_test_priv.dbsession.commit()
+        # The sessions table is empty before the insertion
+        self.ses_id1, self.ses_id2, self.ses_id3, self.ses_id4 = \
+            self.db_test_priv.dbsession.execute(select(Session.id).order_by(Session.id)).scalars()
+        # Expected information of the stored sessions, by session id
+        self.sessions_info = {
+            ses_id: {'id': ses_id, 'workflow_name': session['workflow_name'],
+                     'name': session['name'], 'start_time': session['start_time'],
+                     'end_time': session['end_time'], 'status': session['status']}
+            for ses_id, session in zip((self.ses_id1, self.ses_id2, self.ses_id3, self.ses_id4),
+                                       sessions)}
 
     def test_get_session_info_from_name_no_session0(self):
         """Tests that getting a session info by name behaves as expected when
@@ -298,14 +333,8 @@ class TestGetSessionInfoFromName(unittest.TestCase):
         only the session name is provided and several sessions exist
         with this name in the DB"""
         result = self.db_test_priv.get_session_info_from_name('ses1')
-        expected_result = [
-            {'id': self.ses_id1, 'workflow_name': 'wkf1', 'name': 'ses1',
-             'start_time': 123, 'end_time': 123, 'status': 'status1'},
-            {'id': self.ses_id2, 'workflow_name': 'wkf1', 'name': 'ses1',
-             'start_time': 321, 'end_time': 321, 'status': 'status2'},
-            {'id': self.ses_id4, 'workflow_name': 'wkf4', 'name': 'ses1',
-             'start_time': 789, 'end_time': 789, 'status': 'status4'}
-        ]
+        expected_result = [self.sessions_info[ses_id]
+                           for ses_id in (self.ses_id1, self.ses_id2, self.ses_id4)]
         self.assertListEqual(result, expected_result)
 
     def test_get_session_info_from_name1(self):
@@ -313,35 +342,25 @@ class TestGetSessionInfoFromName(unittest.TestCase):
         both the session and the workflow names are provided and several
         sessions with these names exist in the DB"""
         result = self.db_test_priv.get_session_info_from_name('ses1', 'wkf1')
-        expected_result = [
-            {'id': self.ses_id1, 'workflow_name': 'wkf1', 'name': 'ses1',
-             'start_time': 123, 'end_time': 123, 'status': 'status1'},
-            {'id': self.ses_id2, 'workflow_name': 'wkf1', 'name': 'ses1',
-             'start_time': 321, 'end_time': 321, 'status': 'status2'}
-        ]
+        expected_result = [self.sessions_info[ses_id] for ses_id in (self.ses_id1, self.ses_id2)]
         self.assertListEqual(result, expected_result)
 
 
-class TestGetSessionInfoFromId(unittest.TestCase):
+class TestGetSessionInfoFromId(RollbackDBTestCase):
     """ Test that the function get_session_info_from_id behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         session1 = Session(name='ses1', workflow_name='wkf1', user_name='user',
                            start_time=123, end_time=123, status='status1')
         self.db_test_priv.dbsession.add(session1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
         self.ses_id1 = session1.id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_get_session_info_from_id_no_session(self):
         """Tests that getting a session info by id behaves as expected when
         no session with this session id exists in the DB"""
@@ -358,30 +377,24 @@ class TestGetSessionInfoFromId(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestDeleteSession(unittest.TestCase):
+class TestDeleteSession(RollbackDBTestCase):
     """ Test that the function delete_session behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB
-        and all of them delete tests from the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
-        session1 = Session(name='ses1', workflow_name='wkf1', user_name='user',
-                           start_time=123, end_time= 123, status='status1')
-        session2 = Session(name='ses2', workflow_name='wkf2', user_name='user',
-                           start_time=456, end_time= 456, status='status2')
-        self.db_test_priv.dbsession.add(session1)
-        self.db_test_priv.dbsession.add(session2)
+        sessions = [
+            {'name': 'ses1', 'workflow_name': 'wkf1', 'user_name': 'user',
+             'start_time': 123, 'end_time': 123, 'status': 'status1'},
+            {'name': 'ses2', 'workflow_name': 'wkf2', 'user_name': 'user',
+             'start_time': 456, 'end_time': 456, 'status': 'status2'}]
+        self.db_test_priv.dbsession.execute(Session.__table__.insert(), sessions)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
-        self.db_test_priv.dbsession.refresh(session2)
-        self.ses_id1 = session1.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        self.ses_id1 = self.db_test_priv.dbsession.execute(
+            select(Session.id).where(Session.name == 'ses1')).scalar_one()
 
     def test_delete_session_by_name_single_session(self):
         """Tests that deleting a session behaves as expected when
@@ -390,16 +403,14 @@ class TestDeleteSession(unittest.TestCase):
         with self.assertRaises(UnexistingSessionNameError):
             self.db_test_priv.get_session_info_from_name('ses1')
         # Check that we generated a log into the DB
-        filter_txt = text("object_type == 'session'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
+        session_logs = ObjectActivityLogging.object_type == 'session'
+        result = self.db_test_priv.dbsession.query(*LOG_COLUMNS).filter(session_logs).all()
+        list_dicts = [log._asdict() for log in result]
         expected_result = {'id': 1, 'object_type': 'session',
                            'object_id': self.ses_id1, 'activity': 'removal'}
         # we do this instead of assertListEqual because we do not control the time
         # the activity occurred at
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(list_dicts[0]), _log_fields(expected_result))
 
     def test_delete_session_by_name_several_sessions(self):
         """Tests that deleting a session behaves as expected when
@@ -409,7 +420,6 @@ class TestDeleteSession(unittest.TestCase):
                            start_time=789, end_time=789, status='status3')
         self.db_test_priv.dbsession.add(session3)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session3)
         # Check we have both sessions for the same name
         result = self.db_test_priv.get_session_info_from_name('ses1')
         expected_result = [{'id': self.ses_id1, 'workflow_name': 'wkf1', 'name': 'ses1',
@@ -421,19 +431,12 @@ class TestDeleteSession(unittest.TestCase):
         with self.assertRaises(UnexistingSessionNameError):
             self.db_test_priv.get_session_info_from_name('ses1')
         # Check that we generated 2 logs into the DB
-        filter_txt = text("object_type == 'session'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = [{'id': 1, 'object_type': 'session',
-                            'object_id': self.ses_id1, 'activity': 'removal'},
-                           {'id': 2, 'object_type': 'session',
-                            'object_id': session3.id, 'activity': 'removal'}]
-        # we do this instead of assertListEqual because we do not control the time
-        # the activity occured at
-        for idx in (0, 1):
-            self.assertEqual(list_dicts[idx]['object_type'], expected_result[idx]['object_type'])
-            self.assertEqual(list_dicts[idx]['object_id'], expected_result[idx]['object_id'])
-            self.assertEqual(list_dicts[idx]['activity'], expected_result[idx]['activity'])
+        # we only fetch these columns because we do not control the time the activity occured at
+        session_logs = ObjectActivityLogging.object_type == 'session'
+        result = self.db_test_priv.dbsession.query(*LOG_COLUMNS).filter(session_logs).all()
+        expected_result = [('session', self.ses_id1, 'removal'),
+                           ('session', session3.id, 'removal')]
+        self.assertListEqual(result, expected_result)
 
     def test_delete_session_by_id_no_session(self):
         """Tests that deleting a session by id behaves as expected when
@@ -442,16 +445,14 @@ class TestDeleteSession(unittest.TestCase):
         with self.assertRaises(UnexistingSessionNameError):
             self.db_test_priv.get_session_info_from_name('ses1')
         # Check that we generated a log into the DB
-        filter_txt = text("object_type == 'session'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
+        session_logs = ObjectActivityLogging.object_type == 'session'
+        result = self.db_test_priv.dbsession.query(*LOG_COLUMNS).filter(session_logs).all()
+        list_dicts = [log._asdict() for log in result]
         expected_result = {'id': 1, 'object_type': 'session',
                            'object_id': self.ses_id1, 'activity': 'removal'}
         # we do this instead of assertListEqual because we do not control the time
         # the activity occured at
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(list_dicts[0]), _log_fields(expected_result))
 
     def test_delete_session_by_id_single_session(self):
         """Tests that deleting a session by id behaves as expected when
@@ -460,16 +461,14 @@ class TestDeleteSession(unittest.TestCase):
         with self.assertRaises(UnexistingSessionNameError):
             self.db_test_priv.get_session_info_from_name('ses1')
         # Check that we generated a log into the DB
-        filter_txt = text("object_type == 'session'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
+        session_logs = ObjectActivityLogging.object_type == 'session'
+        result = self.db_test_priv.dbsession.query(*LOG_COLUMNS).filter(session_logs).all()
+        list_dicts = [log._asdict() for log in result]
         expected_result = {'id': 1, 'object_type': 'session',
                            'object_id': self.ses_id1, 'activity': 'removal'}
         # we do this instead of assertListEqual because we do not control the time
         # the activity occured at
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(list_dicts[0]), _log_fields(expected_result))
 
     def test_delete_session_by_name_and_id(self):
         """Tests that deleting a session behaves as expected when
@@ -478,38 +477,31 @@ class TestDeleteSession(unittest.TestCase):
         with self.assertRaises(UnexistingSessionNameError):
             self.db_test_priv.get_session_info_from_name('ses1')
         # Check that we generated a log into the DB
-        filter_txt = text("object_type == 'session'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
+        session_logs = ObjectActivityLogging.object_type == 'session'
+        result = self.db_test_priv.dbsession.query(*LOG_COLUMNS).filter(session_logs).all()
+        list_dicts = [log._asdict() for log in result]
         expected_result = {'id': 1, 'object_type': 'session',
                            'object_id': self.ses_id1, 'activity': 'removal'}
         # we do this instead of assertListEqual because we do not control the time
         # the activity occurred at
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        self.assertEqual(_log_fields(list_dicts[0]), _log_fields(expected_result))
 
 
-class TestUpdateSessionStatus(unittest.TestCase):
+class TestUpdateSessionStatus(RollbackDBTestCase):
     """ Test that the function update_session_status behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         session1 = Session(name='ses1', workflow_name='wkf1', user_name='user',
                            start_time=123, end_time=123, status='status1')
         self.db_test_priv.dbsession.add(session1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session1)
         self.ses_id1 = session1.id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_update_session_status_single_session(self):
         """Tests that updating a session status behaves as expected when
         a single session exists with this name in the DB"""
@@ -527,7 +519,6 @@ class TestUpdateSessionStatus(unittest.TestCase):
                            start_time=456, end_time=456, status='status2')
         self.db_test_priv.dbsession.add(session2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(session2)
         self.db_test_priv.update_session_status('ses1', 'stopped')
         result = self.db_test_priv.get_session_info_from_name('ses1')
         expected_result = [{'id': self.ses_id1, 'workflow_name': 'wkf1', 'name': 'ses1',
@@ -537,29 +528,22 @@ class TestUpdateSessionStatus(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestAddNsLock(unittest.TestCase):
+class TestAddNsLock(RollbackDBTestCase):
     """ Test that the function add_nslock behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
-        ns1 = NamespaceLock(ns_name="ns1", service_name="srv1")
-        ns2 = NamespaceLock(ns_name="ns2", service_name="srv2")
-
-        self.db_test_priv.dbsession.add(ns1)
-        self.db_test_priv.dbsession.add(ns2)
+        nslocks = [{'ns_name': 'ns1', 'service_name': 'srv1'},
+                   {'ns_name': 'ns2', 'service_name': 'srv2'}]
+        self.db_test_priv.dbsession.execute(NamespaceLock.__table__.insert(), nslocks)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(ns1)
-        self.db_test_priv.dbsession.refresh(ns2)
 
         # ids of the already stored namespaces
-        self.ids = [ ns1.id, ns2.id ]
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        self.ids = self.db_test_priv.dbsession.execute(select(NamespaceLock.id)).scalars().all()
 
     def test_add_nslock_unexisting_nslock(self):
         """Tests that adding a not yet existing namespace lock behaves as expected"""
@@ -575,28 +559,30 @@ class TestAddNsLock(unittest.TestCase):
         self.assertNotEqual(result2, result1)
 
 
-class TestDeleteNsLock(unittest.TestCase):
-    """ Test that the function delete_nslock behaves as expected.
+class NamespaceLockTestCase(RollbackDBTestCase):
+    """Base class for the namespace locks tests: each test starts with the ns1 and ns2
+    namespace locks stored into the DB.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.ns1 = NamespaceLock(ns_name="ns1", service_name="srv1")
         self.ns2 = NamespaceLock(ns_name="ns2", service_name="srv2")
 
-        self.db_test_priv.dbsession.add(self.ns1)
-        self.db_test_priv.dbsession.add(self.ns2)
+        self.db_test_priv.dbsession.bulk_save_objects([self.ns1, self.ns2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.ns1)
-        self.db_test_priv.dbsession.refresh(self.ns2)
         self.ns_id1 = self.ns1.id
+        # Expected information of the stored namespace locks
+        self.ns_infos = [{'id': ns.id, 'ns_name': ns.ns_name, 'service_name': ns.service_name}
+                         for ns in (self.ns1, self.ns2)]
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
 
+class TestDeleteNsLock(NamespaceLockTestCase):
+    """ Test that the function delete_nslock behaves as expected.
+    """
     def test_delete_nslock_no_nslock(self):
         """Tests that deleting a namespace lock behaves as expected when
         no namespace exists with this name in the DB"""
@@ -618,12 +604,9 @@ class TestDeleteNsLock(unittest.TestCase):
         ns3 = NamespaceLock(ns_name=self.ns2.ns_name, service_name="srv3")
         self.db_test_priv.dbsession.add(ns3)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(ns3)
 
         # Check we have both services for the same name
-        expected_result = [{'id': self.ns2.id,
-                            'ns_name': self.ns2.ns_name,
-                            'service_name': self.ns2.service_name},
+        expected_result = [self.ns_infos[1],
                            {'id': ns3.id, 'ns_name': ns3.ns_name,
                             'service_name': ns3.service_name}]
         result = self.db_test_priv.get_ns_info_from_name(self.ns2.ns_name)
@@ -633,127 +616,59 @@ class TestDeleteNsLock(unittest.TestCase):
             self.db_test_priv.delete_nslock(self.ns2.ns_name)
 
 
-class TestGetNsInfoFromName(unittest.TestCase):
+class TestGetNsInfoFromName(NamespaceLockTestCase):
     """ Test that the function get_ns_info_from_name behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        self.ns1 = NamespaceLock(ns_name="ns1", service_name="srv1")
-        self.ns2 = NamespaceLock(ns_name="ns2", service_name="srv2")
-
-        self.db_test_priv.dbsession.add(self.ns1)
-        self.db_test_priv.dbsession.add(self.ns2)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.ns1)
-        self.db_test_priv.dbsession.refresh(self.ns2)
-        self.ns_id1 = self.ns1.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
-    def test_get_ns_no_ns(self):
-        """Tests that getting a namespace behaves as expected when
-        no namespace exists with this name in the DB"""
-        result = self.db_test_priv.get_ns_info_from_name('UNKNOWN')
-        expected_result = []
-        self.assertListEqual(result, expected_result)
-
-    def test_get_ns_single_ns(self):
-        """Tests that getting a namespace behaves as expected when
-        a single namespace exists with this name in the DB"""
-        result = self.db_test_priv.get_ns_info_from_name(self.ns1.ns_name)
-        expected_result = [{'id': self.ns1.id,
-                            'ns_name': self.ns1.ns_name,
-                            'service_name': self.ns1.service_name}]
-        self.assertListEqual(result, expected_result)
-
-    def test_get_ns_several_namespaces(self):
-        """Tests that getting a namespace behaves as expected when
-        several namespaces with the same name exist in the DB"""
-        # Add another namespace with the same name
+    def test_get_ns_info_from_name(self):
+        """Tests that getting a namespace behaves as expected when no, a single or
+        several namespaces exist with this name in the DB"""
+        # Add another namespace with the same name as ns2
         ns3 = NamespaceLock(ns_name=self.ns2.ns_name, service_name="srv3")
         self.db_test_priv.dbsession.add(ns3)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(ns3)
 
-        # Check we have both services for the same name
-        expected_result = [{'id': self.ns2.id,
-                            'ns_name': self.ns2.ns_name,
-                            'service_name': self.ns2.service_name},
-                           {'id': ns3.id, 'ns_name': ns3.ns_name,
-                            'service_name': ns3.service_name}]
-        result = self.db_test_priv.get_ns_info_from_name(self.ns2.ns_name)
-        self.assertListEqual(result, expected_result)
+        cases = (('UNKNOWN', []),
+                 (self.ns1.ns_name, self.ns_infos[:1]),
+                 (self.ns2.ns_name, [self.ns_infos[1],
+                                     {'id': ns3.id, 'ns_name': ns3.ns_name,
+                                      'service_name': ns3.service_name}]))
+        for ns_name, expected_result in cases:
+            with self.subTest(ns_name=ns_name):
+                result = self.db_test_priv.get_ns_info_from_name(ns_name)
+                self.assertListEqual(result, expected_result)
 
 
-class TestGetServicesFromNs(unittest.TestCase):
+class TestGetServicesFromNs(NamespaceLockTestCase):
     """ Test that the function get_services_from_ns behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        self.ns1 = NamespaceLock(ns_name="ns1", service_name="srv1")
-        self.ns2 = NamespaceLock(ns_name="ns2", service_name="srv2")
-
-        self.db_test_priv.dbsession.add(self.ns1)
-        self.db_test_priv.dbsession.add(self.ns2)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.ns1)
-        self.db_test_priv.dbsession.refresh(self.ns2)
-        self.ns_id1 = self.ns1.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
-    def test_get_services_ns_no_ns(self):
-        """Tests that getting services from a namespace behaves as expected when
-        no namespace exists with this name in the DB"""
-        result = self.db_test_priv.get_services_from_ns('UNKNOWN')
-        expected_result = []
-        self.assertListEqual(result, expected_result)
-
-    def test_get_services_ns_single_ns(self):
-        """Tests that getting services from a namespace behaves as expected when
-        a single namespace exists with this name in the DB"""
-        result = self.db_test_priv.get_services_from_ns(self.ns1.ns_name)
-        expected_result = [ self.ns1.service_name ]
-        self.assertListEqual(result, expected_result)
-
-    def test_get_services_ns_several_namespaces(self):
-        """Tests that getting services from a namespace behaves as expected when
-        several namespaces with the same name exist in the DB"""
-        # Add another namespace with the same name
+    def test_get_services_from_ns(self):
+        """Tests that getting services from a namespace behaves as expected when no,
+        a single or several namespaces exist with this name in the DB"""
+        # Add another namespace with the same name as ns2
         ns3 = NamespaceLock(ns_name=self.ns2.ns_name, service_name="srv3")
         self.db_test_priv.dbsession.add(ns3)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(ns3)
 
-        # Check we have both services for the same name
-        expected_result = [ self.ns2.service_name, ns3.service_name ]
-        result = self.db_test_priv.get_services_from_ns(self.ns2.ns_name)
-        self.assertListEqual(result, expected_result)
+        cases = (('UNKNOWN', []),
+                 (self.ns1.ns_name, [ self.ns1.service_name ]),
+                 (self.ns2.ns_name, [ self.ns2.service_name, ns3.service_name ]))
+        for ns_name, expected_result in cases:
+            with self.subTest(ns_name=ns_name):
+                result = self.db_test_priv.get_services_from_ns(ns_name)
+                self.assertListEqual(result, expected_result)
 
 
-class TestAddUniqueService(unittest.TestCase):
+class TestAddUniqueService(RollbackDBTestCase):
     """ Test that the function add_unique_service behaves as expected.
     """
     def setUp(self):
-        """Connect to database for tests.
+        """Set up the tests by filling the mock WFM database with 2 services.
         """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored services (see __init__.py)
-        self.ids = [ 1, 2 ]
+        super().setUp()
+        self.db_test = self.wfm_db_mock
 
-    def tearDown(self):
-        self.db_test.dbsession.close()
+        _, services = _store_sessions_services(self.db_test.dbsession)
+        self.ids = [service.id for service in services]
 
     def test_add_unique_service_unexisting_service(self):
         """Tests that adding a not yet existing service behaves as expected"""
@@ -770,17 +685,10 @@ class TestAddUniqueService(unittest.TestCase):
         result = self.db_test.add_unique_service(unexisting_srv_dict, 456, 'allocated', 111)
         self.assertNotIn(result, self.ids)
         # Check that we generated a log into the DB
-        query = f"object_type == 'service' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'service',
-                            'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        # one() fails if there is not exactly one log
+        log = self.db_test.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'service', 'object_id': result}).one()
+        self.assertEqual(log, ('service', result, 'creation'))
 
     def test_add_unique_service_existing_service(self):
         """Tests that adding an already existing service behaves as expected"""
@@ -796,22 +704,20 @@ class TestAddUniqueService(unittest.TestCase):
         }
 
         result = self.db_test.add_unique_service(existing_srv_dict, 0, 'status1', 1)
-        self.assertEqual(result, 1)
+        self.assertEqual(result, self.ids[0])
 
 
-class TestAddService(unittest.TestCase):
+class TestAddService(RollbackDBTestCase):
     """ Test that the function add_service behaves as expected.
     """
     def setUp(self):
-        """Connect to database for tests.
+        """Set up the tests by filling the mock WFM database with 2 services.
         """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored services (see __init__.py)
-        self.ids = [ 1, 2 ]
+        super().setUp()
+        self.db_test = self.wfm_db_mock
 
-    def tearDown(self):
-        self.db_test.dbsession.close()
+        _, services = _store_sessions_services(self.db_test.dbsession)
+        self.ids = [service.id for service in services]
 
     def test_add_service_unexisting_service(self):
         """Tests that adding a not yet existing service behaves as expected"""
@@ -828,17 +734,10 @@ class TestAddService(unittest.TestCase):
         result = self.db_test.add_service(unexisting_srv_dict, 456, 'allocated', 111)
         self.assertNotIn(result, self.ids)
         # Check that we generated a log into the DB
-        query = f"object_type == 'service' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'service',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        # one() fails if there is not exactly one log
+        log = self.db_test.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'service', 'object_id': result}).one()
+        self.assertEqual(log, ('service', result, 'creation'))
 
     def test_add_service_existing_service(self):
         """Tests that adding an already existing service behaves as expected"""
@@ -854,18 +753,40 @@ class TestAddService(unittest.TestCase):
         self.assertNotEqual(result2, result1)
 
 
-class TestGetAllServices(unittest.TestCase):
-    """ Test that the function get_allservices behaves as expected.
+class ServiceTestCase(RollbackDBTestCase):
+    """Base class for the services tests: each test starts with a srv1 service of session 1
+    stored into the DB, built from service1_fields.
     """
+    service1_fields = {'targets': '/tmp', 'flavor': 'small', 'status': 'allocated'}
+
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests expects an empty DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
+
+        self.service1 = Service(session_id=1, name='srv1', service_type='SBB',
+                                location='location1', datanodes=4,
+                                start_time=123, end_time=123, jobid=1, **self.service1_fields)
+        self.db_test_priv.dbsession.add(self.service1)
+        self.db_test_priv.dbsession.commit()
+        self.srv_id1 = self.service1.id
+        self.ses_id1 = self.service1.session_id
+        # Expected information of the stored service
+        self.service1_info = {'id': self.srv_id1, 'session_id': self.ses_id1, 'name': 'srv1',
+                              'type': 'SBB', 'location': 'location1',
+                              'targets': self.service1_fields['targets'],
+                              'status': self.service1_fields['status'], 'jobid': 1}
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+
+class TestGetAllServices(RollbackDBTestCase):
+    """ Test that the function get_allservices behaves as expected.
+    """
+    def setUp(self):
+        """Set up the tests by filling the mock WFM database.
+        """
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
     def test_get_all_services_from_empty_db(self):
         """Tests that getting all services behaves as expected when
@@ -883,7 +804,6 @@ class TestGetAllServices(unittest.TestCase):
                            start_time=123, end_time=123, status='allocated', jobid=1)
         self.db_test_priv.dbsession.add(service1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
         result = self.db_test_priv.get_all_services()
         expected_result = [{'id': service1.id, 'session_id': 1, 'name': 'srv1', 'type': 'SBB',
                             'location': 'location1', 'targets': '/tmp', 'status': 'allocated',
@@ -900,13 +820,9 @@ class TestGetAllServices(unittest.TestCase):
         service2 = Service(session_id=2, name='srv2', service_type='SBB', location='location2',
                            targets='/tmp', flavor='small', datanodes=4,
                            start_time=123, end_time=123, status='allocated', jobid=2)
-        self.db_test_priv.dbsession.add(service1)
-        self.db_test_priv.dbsession.add(service2)
+        self.db_test_priv.dbsession.bulk_save_objects([service1, service2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
-        self.db_test_priv.dbsession.refresh(service2)
         result = self.db_test_priv.get_all_services()
-        expected_result = []
         expected_result = [{'id': service1.id, 'session_id': 1, 'name': 'srv1', 'type': 'SBB',
                             'location': 'location1', 'targets': '/tmp', 'status': 'allocated',
                             'jobid': 1},
@@ -916,28 +832,9 @@ class TestGetAllServices(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestGetServiceInfoFromName(unittest.TestCase):
+class TestGetServiceInfoFromName(ServiceTestCase):
     """ Test that the function get_service_info_from_name behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        service1 = Service(session_id=1, name='srv1', service_type='SBB',
-                           location='location1',
-                           targets='/tmp', flavor='small', datanodes=4,
-                           start_time=123, end_time=123, status='allocated', jobid=1)
-        self.db_test_priv.dbsession.add(service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
-        self.srv_id1 = service1.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_get_service_info_from_name_no_service(self):
         """Tests that getting a service info by name behaves as expected when
         no service with this name exists in the DB"""
@@ -948,9 +845,7 @@ class TestGetServiceInfoFromName(unittest.TestCase):
         """Tests that getting a service info by name behaves as expected when
         a single service exists with this name in the DB"""
         result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 1, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': '/tmp',
-                            'status': 'allocated', 'jobid': 1}]
+        expected_result = [self.service1_info]
         self.assertListEqual(result, expected_result)
 
     def test_get_service_info_from_name_several_services(self):
@@ -963,41 +858,19 @@ class TestGetServiceInfoFromName(unittest.TestCase):
                            start_time=456, end_time=456, status='allocated', jobid=2)
         self.db_test_priv.dbsession.add(service2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service2)
         result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 1, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': '/tmp',
-                            'status': 'allocated', 'jobid': 1},
+        expected_result = [self.service1_info,
                            {'id': service2.id, 'session_id': 2, 'name': 'srv1',
                             'type': 'SBB', 'location': 'location2', 'targets': '/tmp2',
                             'status': 'allocated', 'jobid': 2}]
         self.assertListEqual(result, expected_result)
 
 
-class TestGetServicesInfoFromSessionId(unittest.TestCase):
+class TestGetServicesInfoFromSessionId(ServiceTestCase):
     """ Test that the function get_services_info_from_session_id behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        self.service1 = Service(session_id=1, name='srv1', service_type='SBB',
-                                location='location1',
-                                targets='target1', flavor='flavor1', datanodes=4,
-                                start_time=123, end_time=123, status='status1', jobid=1)
-        self.db_test_priv.dbsession.add(self.service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.service1)
-        self.srv_id1 = self.service1.id
-        self.ses_id1 = self.service1.session_id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
+    # service stored by setUp, as srv1 of session 1
+    service1_fields = {'targets': 'target1', 'flavor': 'flavor1', 'status': 'status1'}
 
     def test_get_services_info_from_session_id_no_service(self):
         """Tests that getting services info by session id behaves as expected when
@@ -1009,9 +882,7 @@ class TestGetServicesInfoFromSessionId(unittest.TestCase):
         """Tests that getting services info by session id behaves as expected when
         a single service exists with this session id in the DB"""
         result = self.db_test_priv.get_services_info_from_session_id(self.ses_id1)
-        expected_result = [{'id': self.srv_id1, 'session_id': self.ses_id1, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': 'target1',
-                            'status': 'status1', 'jobid': 1}]
+        expected_result = [self.service1_info]
         self.assertListEqual(result, expected_result)
 
     def test_get_service_info_from_session_id_several_services(self):
@@ -1024,43 +895,35 @@ class TestGetServicesInfoFromSessionId(unittest.TestCase):
                            start_time=456, end_time=456, status='status2', jobid=2)
         self.db_test_priv.dbsession.add(service2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service2)
         result = self.db_test_priv.get_services_info_from_session_id(self.ses_id1)
-        expected_result = [{'id': self.srv_id1, 'session_id': self.ses_id1, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': 'target1',
-                            'status': 'status1', 'jobid': 1},
+        expected_result = [self.service1_info,
                            {'id': service2.id, 'session_id': self.ses_id1, 'name': 'srv2',
                             'type': 'SBB', 'location': 'location2', 'targets': 'target2',
                             'status': 'status2', 'jobid': 2}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(service2)
+
+    def test_get_service_info_from_session_id_nfs_service(self):
+        """Tests that getting services info by session id returns the namespace and mountpoint
+        of an NFS service instead of its targets"""
+        service2 = Service(session_id=self.ses_id1, name='srv2', service_type='NFS',
+                           location='location2', targets='', flavor='',
+                           namespace='ns2', mountpoint='/mnt/ns2', storagesize='1Gi', datanodes=1,
+                           start_time=456, end_time=456, status='status2', jobid=2)
+        self.db_test_priv.dbsession.add(service2)
         self.db_test_priv.dbsession.commit()
+        result = self.db_test_priv.get_services_info_from_session_id(self.ses_id1)
+        expected_result = [self.service1_info,
+                           {'id': service2.id, 'session_id': self.ses_id1, 'name': 'srv2',
+                            'type': 'NFS', 'location': 'location2', 'namespace': 'ns2',
+                            'mountpoint': '/mnt/ns2', 'status': 'status2', 'jobid': 2}]
+        self.assertListEqual(result, expected_result)
 
 
-class TestGetServiceInfoFromId(unittest.TestCase):
+class TestGetServiceInfoFromId(ServiceTestCase):
     """ Test that the function get_service_info_from_id behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        self.service1 = Service(session_id=1, name='srv1', service_type='SBB',
-                           location='location1',
-                           targets='target1', flavor='flavor1', datanodes=4,
-                           start_time=123, end_time=123, status='status1', jobid=1)
-        self.db_test_priv.dbsession.add(self.service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.service1)
-        self.srv_id1 = self.service1.id
-        self.ses_id1 = self.service1.session_id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
+    # service stored by setUp, as srv1 of session 1
+    service1_fields = {'targets': 'target1', 'flavor': 'flavor1', 'status': 'status1'}
 
     def test_get_service_info_from_id_no_service(self):
         """Tests that getting services info by session id behaves as expected when
@@ -1072,22 +935,83 @@ class TestGetServiceInfoFromId(unittest.TestCase):
         """Tests that getting services info by session id behaves as expected when
         a single service exists with this session id in the DB"""
         result = self.db_test_priv.get_service_info_from_id(self.srv_id1)
-        expected_result = [{'id': self.srv_id1, 'session_id': self.ses_id1, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': 'target1',
-                            'status': 'status1', 'jobid': 1}]
+        expected_result = [self.service1_info]
         self.assertListEqual(result, expected_result)
 
 
-class TestDeleteService(unittest.TestCase):
+class TestSessionServicesStatus(RollbackDBTestCase):
+    """ Test that the functions session_has_service_in_status and session_services_all_in_status
+    behave as expected.
+    """
+    def setUp(self):
+        """Set up the tests by filling the mock WFM database.
+        """
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
+
+        service1 = Service(session_id=1, name='srv1', service_type='SBB',
+                           location='location1',
+                           targets='target1', flavor='flavor1', datanodes=4,
+                           start_time=123, end_time=123, status='allocated', jobid=1)
+        service2 = Service(session_id=1, name='srv2', service_type='SBB',
+                           location='location2',
+                           targets='target2', flavor='flavor2', datanodes=4,
+                           start_time=123, end_time=123, status='teardown', jobid=2)
+        self.db_test_priv.dbsession.bulk_save_objects([service1, service2], return_defaults=True)
+        self.db_test_priv.dbsession.commit()
+
+    def test_session_has_service_in_status_no_session(self):
+        """Tests that checking a service status behaves as expected when
+        no service exists with this session id in the DB"""
+        self.assertFalse(self.db_test_priv.session_has_service_in_status(123, 'TEARDOWN'))
+
+    def test_session_has_service_in_status_no_service_in_status(self):
+        """Tests that checking a service status behaves as expected when
+        no service of the session is in this status"""
+        self.assertFalse(self.db_test_priv.session_has_service_in_status(1, 'STOPPED'))
+
+    def test_session_has_service_in_status_one_service_in_status(self):
+        """Tests that checking a service status behaves as expected when
+        one of the session services is in this status, whatever the case"""
+        self.assertTrue(self.db_test_priv.session_has_service_in_status(1, 'TEARDOWN'))
+        self.assertTrue(self.db_test_priv.session_has_service_in_status(1, 'teardown'))
+
+    def test_session_services_all_in_status_no_session(self):
+        """Tests that checking all the services status behaves as expected when
+        no service exists with this session id in the DB"""
+        self.assertTrue(self.db_test_priv.session_services_all_in_status(123, {'STOPPED'}))
+
+    def test_session_services_all_in_status_some_services_in_status(self):
+        """Tests that checking all the services status behaves as expected when
+        only some of the session services are in these statuses"""
+        self.assertFalse(self.db_test_priv.session_services_all_in_status(1, {'ALLOCATED'}))
+
+    def test_session_services_all_in_status_all_services_in_status(self):
+        """Tests that checking all the services status behaves as expected when
+        all the session services are in these statuses"""
+        self.assertTrue(self.db_test_priv.session_services_all_in_status(1, {'ALLOCATED',
+                                                                             'TEARDOWN'}))
+
+    def test_session_services_all_in_status_service_without_status(self):
+        """Tests that checking all the services status behaves as expected when
+        a session service has no status"""
+        service3 = Service(session_id=2, name='srv3', service_type='SBB', location='location3',
+                           targets='target3', flavor='flavor3', datanodes=4,
+                           start_time=123, end_time=123, status=None, jobid=3)
+        self.db_test_priv.dbsession.add(service3)
+        self.db_test_priv.dbsession.commit()
+        self.assertFalse(self.db_test_priv.session_services_all_in_status(2, {'ALLOCATED'}))
+        self.assertFalse(self.db_test_priv.session_services_all_in_status(2, {'STOPPED'}))
+
+
+class TestDeleteService(RollbackDBTestCase):
     """ Test that the function delete_service behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB
-        and all of them delete tests from the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         service1 = Service(session_id=1, name='srv1', service_type='SBB',
                            location='location1',
@@ -1097,16 +1021,10 @@ class TestDeleteService(unittest.TestCase):
                            location='location2',
                            targets='/tmp2', flavor='small', datanodes=4,
                            start_time=456, end_time=456, status='allocated', jobid=2)
-        self.db_test_priv.dbsession.add(service1)
-        self.db_test_priv.dbsession.add(service2)
+        self.db_test_priv.dbsession.bulk_save_objects([service1, service2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
-        self.db_test_priv.dbsession.refresh(service2)
         self.srv_id1 = service1.id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_delete_service_single_service(self):
         """Tests that deleting a service behaves as expected when
         a single service exists with this name in the DB"""
@@ -1114,16 +1032,9 @@ class TestDeleteService(unittest.TestCase):
         with self.assertRaises(UnexistingServiceNameError):
             self.db_test_priv.get_service_info_from_name('srv1')
         # Check that we generated a log into the DB
-        filter_txt = text("object_type == 'service'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'service',
-                           'object_id': self.srv_id1, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'service', 'object_id': self.srv_id1}).one()
+        self.assertEqual(log, ('service', self.srv_id1, 'removal'))
 
     def test_delete_service_several_services(self):
         """Tests that deleting a service behaves as expected when
@@ -1134,7 +1045,6 @@ class TestDeleteService(unittest.TestCase):
                            start_time=789, end_time=789, status='allocated', jobid=3)
         self.db_test_priv.dbsession.add(service3)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service3)
         # Check we have both services for the same name
         result = self.db_test_priv.get_service_info_from_name('srv1')
         expected_result = [{'id': self.srv_id1, 'session_id': 1, 'name': 'srv1',
@@ -1148,51 +1058,24 @@ class TestDeleteService(unittest.TestCase):
         with self.assertRaises(UnexistingServiceNameError):
             self.db_test_priv.get_service_info_from_name('srv1')
         # Check that we generated 2 logs into the DB
-        filter_txt = text("object_type == 'service'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = [{'id': 1, 'object_type': 'service',
-                            'object_id': self.srv_id1, 'activity': 'removal'},
-                           {'id': 2, 'object_type': 'service',
-                            'object_id': service3.id, 'activity': 'removal'}]
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        for idx in (0, 1):
-            self.assertEqual(list_dicts[idx]['object_type'], expected_result[idx]['object_type'])
-            self.assertEqual(list_dicts[idx]['object_id'], expected_result[idx]['object_id'])
-            self.assertEqual(list_dicts[idx]['activity'], expected_result[idx]['activity'])
+        srv_ids = [self.srv_id1, service3.id]
+        query = select(*LOG_COLUMNS).where(ObjectActivityLogging.object_type == 'service',
+                                           ObjectActivityLogging.object_id.in_(srv_ids)) \
+            .order_by(ObjectActivityLogging.object_id)
+        logs = self.db_test_priv.dbsession.execute(query).all()
+        self.assertListEqual(logs, [('service', self.srv_id1, 'removal'),
+                                    ('service', service3.id, 'removal')])
 
 
-class TestUpdateServiceSessionID(unittest.TestCase):
+class TestUpdateServiceSessionID(ServiceTestCase):
     """ Test that the function update_service_sessionid behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-        service1 = Service(session_id=1, name='srv1', service_type='SBB',
-                           location='location1',
-                           targets='/tmp', flavor='small', datanodes=4,
-                           start_time=123, end_time=123, status='allocated', jobid=1)
-        self.db_test_priv.dbsession.add(service1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
-        self.srv_id1 = service1.id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_update_service_sessionid_single_service(self):
         """Tests that updating a service session id behaves as expected when
         a single service exists with this name in the DB"""
         self.db_test_priv.update_service_sessionid('srv1', 2)
-        result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 2, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': '/tmp',
-                            'status': 'allocated', 'jobid': 1}]
+        result = _services_rows(self.db_test_priv.dbsession, 'srv1')
+        expected_result = [(self.srv_id1, 2, 'srv1', 'SBB', 'location1', '/tmp', 'allocated', 1)]
         self.assertListEqual(result, expected_result)
 
     def test_update_service_sessionid_several_services(self):
@@ -1205,27 +1088,21 @@ class TestUpdateServiceSessionID(unittest.TestCase):
                            start_time=456, end_time=456, status='allocated', jobid=2)
         self.db_test_priv.dbsession.add(service2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service2)
         self.db_test_priv.update_service_sessionid('srv1', 3)
-        result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 3, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location1', 'targets': '/tmp',
-                            'status': 'allocated', 'jobid': 1},
-                           {'id': service2.id, 'session_id': 3, 'name': 'srv1',
-                            'type': 'SBB', 'location': 'location2', 'targets': '/tmp2',
-                            'status': 'allocated', 'jobid': 2}]
+        result = _services_rows(self.db_test_priv.dbsession, 'srv1')
+        expected_result = [(self.srv_id1, 3, 'srv1', 'SBB', 'location1', '/tmp', 'allocated', 1),
+                           (service2.id, 3, 'srv1', 'SBB', 'location2', '/tmp2', 'allocated', 2)]
         self.assertListEqual(result, expected_result)
 
 
-class TestUpdateServiceStatus(unittest.TestCase):
+class TestUpdateServiceStatus(RollbackDBTestCase):
     """ Test that the function update_service_status behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         service1 = Service(session_id=1, name='srv1', service_type='SBB',
                            location='',
@@ -1233,20 +1110,14 @@ class TestUpdateServiceStatus(unittest.TestCase):
                            start_time=123, end_time=123, status='allocated', jobid=1)
         self.db_test_priv.dbsession.add(service1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service1)
         self.srv_id1 = service1.id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_update_service_status_single_service(self):
         """Tests that updating a service status behaves as expected when
         a single service exists with this name in the DB"""
         self.db_test_priv.update_service_status('srv1', 'stopped')
-        result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 1, 'name': 'srv1',
-                            'type': 'SBB', 'location': '', 'targets': '/tmp', 'status': 'stopped',
-                            'jobid': 1}]
+        result = _services_rows(self.db_test_priv.dbsession, 'srv1')
+        expected_result = [(self.srv_id1, 1, 'srv1', 'SBB', '', '/tmp', 'stopped', 1)]
         self.assertListEqual(result, expected_result)
 
     def test_update_service_status_several_services(self):
@@ -1258,73 +1129,51 @@ class TestUpdateServiceStatus(unittest.TestCase):
                            start_time=456, end_time=456, status='allocating', jobid=2)
         self.db_test_priv.dbsession.add(service2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(service2)
         self.db_test_priv.update_service_status('srv1', 'stopped')
-        result = self.db_test_priv.get_service_info_from_name('srv1')
-        expected_result = [{'id': self.srv_id1, 'session_id': 1, 'name': 'srv1',
-                            'type': 'SBB', 'location': '', 'targets': '/tmp', 'status': 'stopped',
-                            'jobid': 1},
-                           {'id': service2.id, 'session_id': 2, 'name': 'srv1',
-                            'type': 'SBB', 'location': '', 'targets': '/tmp2', 'status': 'stopped',
-                            'jobid': 2}]
+        result = _services_rows(self.db_test_priv.dbsession, 'srv1')
+        expected_result = [(self.srv_id1, 1, 'srv1', 'SBB', '', '/tmp', 'stopped', 1),
+                           (service2.id, 2, 'srv1', 'SBB', '', '/tmp2', 'stopped', 2)]
         self.assertListEqual(result, expected_result)
 
 
-class TestAddUniqueStepDescription(unittest.TestCase):
+class TestAddUniqueStepDescription(RollbackDBTestCase):
     """ Test that the function add_unique_step_description behaves as expected.
     """
     def setUp(self):
-        """Connect to database for tests.
+        """Set up the tests by filling the mock WFM database with 2 sessions,
+        each one with a service and an "a" step description.
         """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored step descriptions (see __init__.py)
-        self.ids = [ 1, 2 ]
+        super().setUp()
+        self.db_test = self.wfm_db_mock
 
-    def tearDown(self):
-        self.db_test.dbsession.close()
+        sessions, step_descriptions = _store_step_descriptions(self.db_test.dbsession)
+        self.ses_ids = [session.id for session in sessions]
+        self.ids = [stepd.id for stepd in step_descriptions]
 
     def test_add_unique_step_description_unexisting_step(self):
-        """Tests that adding a not yet existing step description behaves as expected"""
-        result = self.db_test.add_unique_step_description(2, 'unexisting_name',
-                                                          'fake_command', 'e2')
-        self.assertNotIn(result, self.ids)
-        # Check that we generated a log into the DB
-        query = f"object_type == 'step_description' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-
-    def test_add_unique_step_description_existing_step1(self):
+        """Tests that adding a not yet existing step description behaves as expected, whether
+        its name is unknown or only used in another session"""
+        cases = ((self.ses_ids[1], 'unexisting_name', 'e2'),
+                 # in a session without step description
+                 (self.ses_ids[-1] + 1, 'a', 'e1'))
+        for ses_id, name, service_name in cases:
+            with self.subTest(ses_id=ses_id, name=name):
+                result = self.db_test.add_unique_step_description(ses_id, name,
+                                                                  'fake_command', service_name)
+                self.assertNotIn(result, self.ids)
+                # Check that we generated a log into the DB
+                # one() fails if there is not exactly one log
+                log = self.db_test.dbsession.execute(
+                    OBJECT_LOG_QUERY,
+                    {'object_type': 'step_description', 'object_id': result}).one()
+                self.assertEqual(log, ('step_description', result, 'creation'))
+
+    def test_add_unique_step_description_existing_step(self):
         """Tests that adding an already existing step description (name and session id identical)
         behaves as expected"""
-        result = self.db_test.add_unique_step_description(1, 'a', 'fake_command', 'e1')
-        self.assertEqual(result, 1)
-
-    def test_add_unique_step_description_existing_step2(self):
-        """Tests that adding an already existing step description (name identical)
-        behaves as expected"""
-        result = self.db_test.add_unique_step_description(3, 'a', 'fake_command', 'e1')
-        self.assertNotIn(result, self.ids)
-        # Check that we generated a log into the DB
-        query = f"object_type == 'step_description' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        result = self.db_test.add_unique_step_description(self.ses_ids[0], 'a',
+                                                          'fake_command', 'e1')
+        self.assertEqual(result, self.ids[0])
 
     def test_add_unique_step_description_empty_service_name(self):
         """Tests that adding a step description with an empty service name
@@ -1340,86 +1189,48 @@ class TestAddUniqueStepDescription(unittest.TestCase):
         self.assertEqual(result[0]['service_id'], expected_service_id)
 
 
-class TestAddStepDescription(unittest.TestCase):
+class TestAddStepDescription(RollbackDBTestCase):
     """ Test that the function add_step_description behaves as expected.
     """
     def setUp(self):
-        """Connect to database for tests.
+        """Set up the tests by filling the mock WFM database with 2 sessions,
+        each one with a service and an "a" step description.
         """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored services (see __init__.py)
-        self.ids = [ 1, 2 ]
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
-
-    def test_add_step_description_unexisting_step(self):
-        """Tests that adding a not yet existing step description behaves as expected"""
-        result = self.db_test.add_step_description(2, 'unexisting_name', 'fake_command', 1)
-        self.assertNotIn(result, self.ids)
-        # Check that we generated a log into the DB
-        query = f"object_type == 'step_description' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-
-    def test_add_step_description_existing_step1(self):
-        """Tests that adding an already existing step description (name and session id identical)
-        behaves as expected"""
-        result = self.db_test.add_step_description(1, 'a1', 'fake_command', 1)
-        self.assertNotIn(result, self.ids)
-        # Check that we generated a log into the DB
-        query = f"object_type == 'step_description' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-
-    def test_add_step_description_existing_step2(self):
-        """Tests that adding an already existing step description (name identical)
-        behaves as expected"""
-        result = self.db_test.add_step_description(2, 'a1', 'fake_command', 1)
-        self.assertNotIn(result, self.ids)
-        # Check that we generated a log into the DB
-        query = f"object_type == 'step_description' AND object_id == {result}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': result, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-
-
-class TestGetAllStepsDescriptions(unittest.TestCase):
+        super().setUp()
+        self.db_test = self.wfm_db_mock
+
+        sessions, step_descriptions = _store_step_descriptions(self.db_test.dbsession)
+        self.ses_ids = [session.id for session in sessions]
+        self.ids = [stepd.id for stepd in step_descriptions]
+
+    def test_add_step_description(self):
+        """Tests that adding a step description always stores a new one, whether a step
+        description with the same name (and session id) already exists or not"""
+        cases = ((self.ses_ids[1], 'unexisting_name'),
+                 # name and session id identical
+                 (self.ses_ids[0], 'a'),
+                 # name identical, in a session without step description
+                 (self.ses_ids[-1] + 1, 'a'))
+        for ses_id, name in cases:
+            with self.subTest(ses_id=ses_id, name=name):
+                result = self.db_test.add_step_description(ses_id, name, 'fake_command', 1)
+                self.assertNotIn(result, self.ids)
+                # Check that we generated a log into the DB
+                # one() fails if there is not exactly one log
+                log = self.db_test.dbsession.execute(
+                    OBJECT_LOG_QUERY,
+                    {'object_type': 'step_description', 'object_id': result}).one()
+                self.assertEqual(log, ('step_description', result, 'creation'))
+
+
+class TestGetAllStepsDescriptions(RollbackDBTestCase):
     """ Test that the function get_all_steps_descriptions behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Do this because we need an empty DB for one of the tests.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
     def test_get_all_steps_descriptions_from_empty_db(self):
         """Tests that getting all steps descriptions behaves as expected when
@@ -1435,13 +1246,10 @@ class TestGetAllStepsDescriptions(unittest.TestCase):
         stepd1 = StepDescription(session_id=1, name='step1', command='command1', service_id=10)
         self.db_test_priv.dbsession.add(stepd1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
         result = self.db_test_priv.get_all_steps_descriptions()
         expected_result = [{'id': stepd1.id, 'name': 'step1', 'session_id': 1,
                             'service_id': stepd1.service_id, 'command': 'command1'}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(stepd1)
-        self.db_test_priv.dbsession.commit()
 
     def test_get_all_steps_descriptions_several_steps(self):
         """Tests that getting all steps descriptions behaves as expected when
@@ -1449,42 +1257,31 @@ class TestGetAllStepsDescriptions(unittest.TestCase):
         # First add 2 step descriptions (DB is empty)
         stepd1 = StepDescription(session_id=1, name='step1', command='command1', service_id=10)
         stepd2 = StepDescription(session_id=2, name='step2', command='command2', service_id=20)
-        self.db_test_priv.dbsession.add(stepd1)
-        self.db_test_priv.dbsession.add(stepd2)
+        self.db_test_priv.dbsession.bulk_save_objects([stepd1, stepd2], return_defaults=True)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.db_test_priv.dbsession.refresh(stepd2)
         result = self.db_test_priv.get_all_steps_descriptions()
         expected_result = [{'id': stepd1.id, 'name': 'step1', 'session_id': 1,
                             'service_id': stepd1.service_id, 'command': 'command1'},
                            {'id': stepd2.id, 'name': 'step2', 'session_id': 2,
                             'service_id': stepd2.service_id, 'command': 'command2'}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(stepd1)
-        self.db_test_priv.dbsession.delete(stepd2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepDescriptionInfoFromName(unittest.TestCase):
+class TestGetStepDescriptionInfoFromName(RollbackDBTestCase):
     """ Test that the function get_step_description_info_from_name behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         stepd1 = StepDescription(session_id=1, name='step1', command='command1', service_id=10)
         self.db_test_priv.dbsession.add(stepd1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.stepd_id1 = stepd1.id
-        self.stepd_cmd = stepd1.command
-        self.stepd_srvid = stepd1.service_id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        # Expected information of the stored step description
+        self.stepd1_info = {'id': stepd1.id, 'name': 'step1', 'session_id': 1,
+                            'service_id': 10, 'command': 'command1'}
 
     def test_get_step_description_info_from_name_no_step(self):
         """Tests that getting a step description info by name behaves as expected when
@@ -1496,8 +1293,7 @@ class TestGetStepDescriptionInfoFromName(unittest.TestCase):
         """Tests that getting a step description info by name behaves as expected when
         a single step exists with this name in the DB"""
         result = self.db_test_priv.get_step_description_info_from_name('step1')
-        expected_result = [{'id': self.stepd_id1, 'name': 'step1', 'session_id': 1,
-                            'service_id': self.stepd_srvid, 'command': 'command1'}]
+        expected_result = [self.stepd1_info]
         self.assertListEqual(result, expected_result)
 
     def test_get_step_description_info_from_name_several_steps(self):
@@ -1506,39 +1302,30 @@ class TestGetStepDescriptionInfoFromName(unittest.TestCase):
         stepd2 = StepDescription(session_id=2, name='step1', command='command1', service_id=20)
         self.db_test_priv.dbsession.add(stepd2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd2)
         result = self.db_test_priv.get_step_description_info_from_name('step1')
-        expected_result = [{'id': self.stepd_id1, 'name': 'step1', 'session_id': 1,
-                            'service_id': self.stepd_srvid, 'command': self.stepd_cmd},
+        expected_result = [self.stepd1_info,
                            {'id': stepd2.id, 'name': 'step1', 'session_id': 2,
                             'service_id': stepd2.service_id, 'command': 'command1'}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(stepd2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepDescriptionsFromSessionId(unittest.TestCase):
+class TestGetStepDescriptionsFromSessionId(RollbackDBTestCase):
     """ Test that the function get_step_descriptions_from_session_id behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.session_id = 3
         stepd1 = StepDescription(session_id=self.session_id, name='step1', command='command1',
                                  service_id=10)
         self.db_test_priv.dbsession.add(stepd1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.stepd_id1 = stepd1.id
-        self.stepd_cmd = stepd1.command
-        self.stepd_srvid = stepd1.service_id
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        # Expected information of the stored step description
+        self.stepd1_info = {'id': stepd1.id, 'name': 'step1', 'session_id': self.session_id,
+                            'service_id': 10, 'command': 'command1'}
 
     def test_get_step_descriptions_from_session_id_no_step(self):
         """Tests that getting a step description info by session id behaves as expected when
@@ -1550,8 +1337,7 @@ class TestGetStepDescriptionsFromSessionId(unittest.TestCase):
         """Tests that getting a step description info by session id behaves as expected when
         a single step description exists with this session id in the DB"""
         result = self.db_test_priv.get_step_descriptions_from_session_id(self.session_id)
-        expected_result = [{'id': self.stepd_id1, 'name': 'step1', 'session_id': self.session_id,
-                            'service_id': self.stepd_srvid, 'command': self.stepd_cmd}]
+        expected_result = [self.stepd1_info]
         self.assertListEqual(result, expected_result)
 
     def test_get_step_descriptions_from_session_id_several_steps(self):
@@ -1561,34 +1347,28 @@ class TestGetStepDescriptionsFromSessionId(unittest.TestCase):
                                  service_id=20)
         self.db_test_priv.dbsession.add(stepd2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd2)
         result = self.db_test_priv.get_step_descriptions_from_session_id(self.session_id)
-        expected_result = [{'id': self.stepd_id1, 'name': 'step1', 'session_id': self.session_id,
-                            'service_id': self.stepd_srvid, 'command': self.stepd_cmd},
+        expected_result = [self.stepd1_info,
                            {'id': stepd2.id, 'name': stepd2.name, 'session_id': self.session_id,
                             'service_id': stepd2.service_id, 'command': stepd2.command}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(stepd2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepDescription(unittest.TestCase):
+class TestGetStepDescription(RollbackDBTestCase):
     """ Test that the function get_step_description behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.stepd1 = StepDescription(session_id=1, name='step1', command='command1', service_id=10)
         self.db_test_priv.dbsession.add(self.stepd1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.stepd1)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        # Expected information of the stored step description
+        self.stepd1_info = {'id': self.stepd1.id, 'name': 'step1', 'session_id': 1,
+                            'service_id': 10, 'command': 'command1'}
 
     def test_get_step_description_no_step(self):
         """Tests that getting a step description info by name behaves as expected when
@@ -1601,12 +1381,7 @@ class TestGetStepDescription(unittest.TestCase):
         """Tests that getting a step description info behaves as expected when
         a single step exists with this step name and this session id in the DB"""
         result = self.db_test_priv.get_step_description(self.stepd1.session_id, self.stepd1.name)
-        expected_result = [{'id': self.stepd1.id,
-                            'name': self.stepd1.name,
-                            'session_id': self.stepd1.session_id,
-                            'service_id': self.stepd1.service_id,
-                            'command': self.stepd1.command
-                           }]
+        expected_result = [self.stepd1_info]
         self.assertListEqual(result, expected_result)
 
     def test_get_step_description_several_steps(self):
@@ -1617,39 +1392,31 @@ class TestGetStepDescription(unittest.TestCase):
                                 command='command2', service_id=20)
         self.db_test_priv.dbsession.add(stepd2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd2)
         result = self.db_test_priv.get_step_description(self.stepd1.session_id,
                                                         self.stepd1.name)
-        expected_result = [{'id': self.stepd1.id, 'name': self.stepd1.name,
-                            'session_id': self.stepd1.session_id,
-                            'service_id': self.stepd1.service_id, 'command': self.stepd1.command,
-                           },
+        expected_result = [self.stepd1_info,
                            {'id': stepd2.id, 'name': self.stepd1.name,
                             'session_id': self.stepd1.session_id,
                             'service_id': stepd2.service_id, 'command': stepd2.command,
                            }]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(stepd2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepDescriptionFromId(unittest.TestCase):
+class TestGetStepDescriptionFromId(RollbackDBTestCase):
     """ Test that the function get_step_description_from_id behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.stepd1 = StepDescription(session_id=1, name='step1', command='command1', service_id=10)
         self.db_test_priv.dbsession.add(self.stepd1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.stepd1)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        # Expected information of the stored step description
+        self.stepd1_info = {'id': self.stepd1.id, 'name': 'step1', 'session_id': 1,
+                            'service_id': 10, 'command': 'command1'}
 
     def test_get_step_description_from_id_no_step(self):
         """Tests that getting a step description info by id behaves as expected when
@@ -1661,36 +1428,31 @@ class TestGetStepDescriptionFromId(unittest.TestCase):
         """Tests that getting a step description info behaves as expected when
         a single step exists with this step id in the DB"""
         result = self.db_test_priv.get_step_description_from_id(self.stepd1.id)
-        expected_result = [{'id': self.stepd1.id,
-                            'name': self.stepd1.name,
-                            'session_id': self.stepd1.session_id,
-                            'service_id': self.stepd1.service_id,
-                            'command': self.stepd1.command
-                           }]
+        expected_result = [self.stepd1_info]
         self.assertListEqual(result, expected_result)
 
 
-class TestUpdateStepDescriptionWithStep(unittest.TestCase):
+class TestUpdateStepDescriptionWithStep(RollbackDBTestCase):
     """ Test that the function update_step_description_with_step behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB
-        and all of them delete tests from the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.stepd1 = StepDescription(session_id=1, name='step1', command='command1')
         self.stepd2 = StepDescription(session_id=2, name='step2', command='command2')
 
-        self.step1 = Step(step_description_id=self.stepd1.id, start_time=123, stop_time=123,
+        # The steps are attached through the steps lists below: the step descriptions ids are
+        # only known once flushed
+        self.step1 = Step(start_time=123, stop_time=123,
                           status='status1', progress='Copying 10%', jobid=10,
                           instance_name='step1_1')
-        self.step20 = Step(step_description_id=self.stepd2.id, start_time=123, stop_time=123,
+        self.step20 = Step(start_time=123, stop_time=123,
                           status='status20', progress='Copying 20%', jobid=20,
                           instance_name='step2_1')
-        self.step21 = Step(step_description_id=self.stepd2.id, start_time=123, stop_time=123,
+        self.step21 = Step(start_time=123, stop_time=123,
                           status='status21', progress='Copying 21%', jobid=21,
                           instance_name='step2_2')
 
@@ -1698,25 +1460,10 @@ class TestUpdateStepDescriptionWithStep(unittest.TestCase):
         self.stepd1.steps = []
         self.stepd2.steps = [self.step20]
 
-        self.db_test_priv.dbsession.add(self.stepd1)
-        self.db_test_priv.dbsession.add(self.stepd2)
-        self.db_test_priv.dbsession.add(self.step1)
-        self.db_test_priv.dbsession.add(self.step20)
-        self.db_test_priv.dbsession.add(self.step21)
+        # add_all rather than bulk_save_objects: the steps lists have to be stored too
+        self.db_test_priv.dbsession.add_all([self.stepd1, self.stepd2, self.step1,
+                                             self.step20, self.step21])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.stepd1)
-        self.db_test_priv.dbsession.refresh(self.stepd2)
-        self.db_test_priv.dbsession.refresh(self.step1)
-        self.db_test_priv.dbsession.refresh(self.step20)
-        self.db_test_priv.dbsession.refresh(self.step21)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.stepd1)
-        self.db_test_priv.dbsession.delete(self.stepd2)
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.delete(self.step20)
-        self.db_test_priv.dbsession.delete(self.step21)
-        self.db_test_priv.dbsession.close()
 
     def test_update_step_description_with_step_none(self):
         """Tests that updating a step description's step list behaves as expected when
@@ -1747,50 +1494,46 @@ class TestUpdateStepDescriptionWithStep(unittest.TestCase):
         a step description exists with this id in the DB and its step list is empty"""
         result = self.db_test_priv.update_step_description_with_step(self.stepd1.id, self.step1.id)
         self.assertEqual(result, 0)
-        expected_result = [self.step1]
-        result = self.db_test_priv.get_objs_query(StepDescription, f"id == '{self.stepd1.id}'")
-        self.assertListEqual(result[0].steps, expected_result)
+        expected_result = [self.step1.id]
+        query = select(Step.id).where(Step.step_description_id == self.stepd1.id) \
+            .order_by(Step.id)
+        result = self.db_test_priv.dbsession.execute(query).scalars().all()
+        self.assertListEqual(result, expected_result)
 
     def test_update_step_description_with_step_single_elem_step_list(self):
         """Tests that updating a step description's step list behaves as expected when
         a step description exists with this id in the DB and its step list is not empty"""
         result = self.db_test_priv.update_step_description_with_step(self.stepd2.id, self.step21.id)
         self.assertEqual(result, 0)
-        expected_result = [self.step20, self.step21]
-        result = self.db_test_priv.get_objs_query(StepDescription, f"id == '{self.stepd2.id}'")
-        self.assertListEqual(result[0].steps, expected_result)
+        expected_result = [self.step20.id, self.step21.id]
+        query = select(Step.id).where(Step.step_description_id == self.stepd2.id) \
+            .order_by(Step.id)
+        result = self.db_test_priv.dbsession.execute(query).scalars().all()
+        self.assertListEqual(result, expected_result)
 
 
-class TestDeleteStepDescription(unittest.TestCase):
+class TestDeleteStepDescription(RollbackDBTestCase):
     """ Test that the function delete_step_description behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB
-        and all of them delete tests from the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         stepd1 = StepDescription(session_id=1, name='step1', command='command1')
         stepd2 = StepDescription(session_id=2, name='step2', command='command2')
-        self.db_test_priv.dbsession.add(stepd1)
-        self.db_test_priv.dbsession.add(stepd2)
+        self.db_test_priv.dbsession.add_all([stepd1, stepd2])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.db_test_priv.dbsession.refresh(stepd2)
         self.stepd_id1 = stepd1.id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
-
     def test_delete_step_description_no_step(self):
         """Tests that deleting a step description behaves as expected when
         no step description exists with this id in the DB"""
         self.db_test_priv.delete_step_description(123)
         # Check that we didn't generate any log into the DB
-        query = "object_type == 'step_description'"
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
+        query = select(*LOG_COLUMNS).where(ObjectActivityLogging.object_type == 'step_description')
+        result = self.db_test_priv.dbsession.execute(query).all()
         self.assertListEqual(result, [])
 
     def test_delete_step_description_single_step(self):
@@ -1800,31 +1543,18 @@ class TestDeleteStepDescription(unittest.TestCase):
         result = self.db_test_priv.get_step_description_info_from_name('step1')
         self.assertListEqual(result, [])
         # Check that we generated a log into the DB
-        query = "object_type == 'step_description'"
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': self.stepd_id1, 'activity': 'removal'}
-        list_dicts = [item.dict() for item in result]
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY,
+            {'object_type': 'step_description', 'object_id': self.stepd_id1}).one()
+        self.assertEqual(log, ('step_description', self.stepd_id1, 'removal'))
 
 
-class TestAddStep(unittest.TestCase):
+class TestAddStep(SharedDBTestCase):
     """ Test that the function add_step behaves as expected.
     """
-    def setUp(self):
-        """Connect to database for tests.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-        # ids of the already stored steps (see __init__.py)
-        self.step_ids = [ 1, 2, 3 ]
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
+    # ids of the already stored steps (see __init__.py)
+    step_ids = [ 1, 2, 3 ]
 
     def test_add_step_unexisting_step(self):
         """Tests that adding a not existing description step behaves as expected"""
@@ -1840,31 +1570,14 @@ class TestAddStep(unittest.TestCase):
         self.assertNotIn(step_id, self.step_ids)
         self.assertEqual(step_name, "user-s1-a_3")
         # Check that we generated a log into the DB
-        query = f"object_type == 'step' AND object_id == {step_id}"
-        result_query = self.db_test.dbsession.query(ObjectActivityLogging).filter(text(query)).all()
-        list_dicts = [item.dict() for item in result_query]
-        self.assertEqual(len(list_dicts), 1)
-        expected_result = {'id': 1, 'object_type': 'step',
-                           'object_id': step_id, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        # delete added step
-        self.db_test.delete_step(step_id=step_id)
+        # one() fails if there is not exactly one log
+        log = self.db_test.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step', 'object_id': step_id}).one()
+        self.assertEqual(log, ('step', step_id, 'creation'))
 
-class TestUniqueStepInstanceName(unittest.TestCase):
+class TestUniqueStepInstanceName(SharedDBTestCase):
     """ Test that the function unique_step_instance_name behaves as expected.
     """
-    def setUp(self):
-        """Connect to database for tests.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
-
     def test_unique_step_instance_name_no_step_descr(self):
         """Tests a call with a not existing description id behaves as expected"""
         with self.assertRaises(NoDocumentError):
@@ -1876,18 +1589,14 @@ class TestUniqueStepInstanceName(unittest.TestCase):
         self.assertEqual(result, "user-s1-a_3")
 
 
-class TestGetAllSteps(unittest.TestCase):
+class TestGetAllSteps(RollbackDBTestCase):
     """ Test that the function get_all_steps behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Do this because we need an empty DB for one of the tests.
+        """Set up the tests with the empty mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
     def test_get_all_steps_from_empty_db(self):
         """Tests that getting all steps behaves as expected when
@@ -1904,15 +1613,12 @@ class TestGetAllSteps(unittest.TestCase):
                      status='status1', progress='progress1', jobid=1, instance_name='step1_1')
         self.db_test_priv.dbsession.add(step1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(step1)
         result = self.db_test_priv.get_all_steps()
         expected_result = [{'id': step1.id,'instance_name': step1.instance_name,
                             'status': step1.status,
                             'progress': step1.progress,
                             'jobid': step1.jobid, 'step_description_id': step1.step_description_id}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(step1)
-        self.db_test_priv.dbsession.commit()
 
     def test_get_all_steps_several_steps(self):
         """Tests that getting all steps behaves as expected when
@@ -1922,11 +1628,8 @@ class TestGetAllSteps(unittest.TestCase):
                      status='status1', progress='progress1', jobid=1, instance_name='step1_1')
         step2 = Step(step_description_id=2, start_time=123, stop_time=123,
                      status='status2', progress='progress2', jobid=2, instance_name='step2_1')
-        self.db_test_priv.dbsession.add(step1)
-        self.db_test_priv.dbsession.add(step2)
+        self.db_test_priv.dbsession.add_all([step1, step2])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(step1)
-        self.db_test_priv.dbsession.refresh(step2)
         result = self.db_test_priv.get_all_steps()
         expected_result = [{'id': step1.id, 'instance_name': step1.instance_name,
                             'status': step1.status,
@@ -1937,40 +1640,27 @@ class TestGetAllSteps(unittest.TestCase):
                             'progress': step2.progress,
                             'jobid': step2.jobid, 'step_description_id': step2.step_description_id}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(step1)
-        self.db_test_priv.dbsession.delete(step2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepsInfoFromSessionId(unittest.TestCase):
+class TestGetStepsInfoFromSessionId(RollbackDBTestCase):
     """ Test that the function get_steps_info_from_session_id behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         stepd1 = StepDescription(session_id=1, name='step1', command='command1')
         self.step1 = Step(step_description_id=stepd1.id, start_time=123, stop_time=123,
                           status='status1', progress='progress1', jobid=3, instance_name='step1_1')
         stepd1.steps = [ self.step1 ]
-        self.db_test_priv.dbsession.add(stepd1)
-        self.db_test_priv.dbsession.add(self.step1)
+        self.db_test_priv.dbsession.add_all([stepd1, self.step1])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.db_test_priv.dbsession.refresh(self.step1)
         self.step_id1 = self.step1.id
         self.ses_id1 = stepd1.session_id
         self.stepd1 = stepd1
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.delete(self.stepd1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
-
     def test_get_steps_info_from_session_id_no_step(self):
         """Tests that getting steps info by session id behaves as expected when
         no step with this session id exists in the DB"""
@@ -1996,11 +1686,8 @@ class TestGetStepsInfoFromSessionId(unittest.TestCase):
                      start_time=456, stop_time=456,
                      status='status2', progress='progress2', jobid=30)
         stepd2.steps = [ step2 ]
-        self.db_test_priv.dbsession.add(stepd2)
-        self.db_test_priv.dbsession.add(step2)
+        self.db_test_priv.dbsession.add_all([stepd2, step2])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd2)
-        self.db_test_priv.dbsession.refresh(step2)
         result = self.db_test_priv.get_steps_info_from_session_id(self.ses_id1)
         expected_result = [{'id': self.step_id1, 'instance_name': self.step1.instance_name,
                             'status': 'status1', 'progress': self.step1.progress,
@@ -2009,34 +1696,24 @@ class TestGetStepsInfoFromSessionId(unittest.TestCase):
                             'status': 'status2', 'progress': step2.progress, 'jobid': 30,
                             'step_description_id': stepd2.id}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(step2)
-        self.db_test_priv.dbsession.delete(stepd2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepsInfoFromStepDescriptionId(unittest.TestCase):
+class TestGetStepsInfoFromStepDescriptionId(RollbackDBTestCase):
     """ Test that the function get_steps_info_from_step_description_id behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.step1 = Step(step_description_id=2, start_time=123, stop_time=123,
                      status='status1', progress='progress1', jobid=3, instance_name='step_1')
         self.db_test_priv.dbsession.add(self.step1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.step1)
         self.step_id1 = self.step1.id
         self.step_descr_id1 = self.step1.step_description_id
 
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
-
     def test_get_steps_info_from_step_description_no_step(self):
         """Tests that getting steps info by step description id behaves as expected when
         no step with this step description id exists in the DB"""
@@ -2062,7 +1739,6 @@ class TestGetStepsInfoFromStepDescriptionId(unittest.TestCase):
                      status='status2', progress='progress2', jobid=30)
         self.db_test_priv.dbsession.add(step2)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(step2)
         result = self.db_test_priv.get_steps_info_from_step_description_id(self.step_descr_id1)
         expected_result = [{'id': self.step_id1, 'status': 'status1',
                             'progress': self.step1.progress, 'jobid': 3,
@@ -2073,22 +1749,11 @@ class TestGetStepsInfoFromStepDescriptionId(unittest.TestCase):
                             'step_description_id': self.step_descr_id1,
                             'instance_name': step2.instance_name}]
         self.assertListEqual(result, expected_result)
-        self.db_test_priv.dbsession.delete(step2)
-        self.db_test_priv.dbsession.commit()
 
 
-class TestGetStepsInfoFromStepDescriptionName(unittest.TestCase):
+class TestGetStepsInfoFromStepDescriptionName(SharedDBTestCase):
     """ Test that the function get_steps_info_from_step_description_name behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
-
     def test_get_steps_info_from_step_description_name_no_step(self):
         """Tests that getting steps info by step description name behaves as expected when
         no step with this step description name exists in the DB"""
@@ -2120,18 +1785,9 @@ class TestGetStepsInfoFromStepDescriptionName(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestGetStepsInfoFromJobid(unittest.TestCase):
+class TestGetStepsInfoFromJobid(SharedDBTestCase):
     """ Test that the function get_steps_info_from_jobid behaves as expected.
     """
-    def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
-        """
-        self.db_test = WFMDatabase(name=TEST_DATABASE)
-
-    def tearDown(self):
-        self.db_test.dbsession.close()
-
     def test_get_steps_info_from_jobid_no_step(self):
         """Tests that getting steps info by jobid behaves as expected when
         no step with this jobid exists in the DB"""
@@ -2157,7 +1813,6 @@ class TestGetStepsInfoFromJobid(unittest.TestCase):
                         jobid=2000, progress="progress21")
         self.db_test.dbsession.add(step_a21)
         self.db_test.dbsession.commit()
-        self.db_test.dbsession.refresh(step_a21)
         result = self.db_test.get_steps_info_from_jobid(2000)
         expected_result = [{'id': 3, 'status': 'status20', 'progress': "Copying 20%",
                             'step_description_id': 2, 'jobid': 2000,
@@ -2166,20 +1821,16 @@ class TestGetStepsInfoFromJobid(unittest.TestCase):
                             'step_description_id': 2, 'jobid': 2000,
                             'instance_name': "s2_a_2"}]
         self.assertListEqual(result, expected_result)
-        self.db_test.dbsession.delete(step_a21)
-        self.db_test.dbsession.commit()
 
 
-class TestDeleteStep(unittest.TestCase):
+class TestDeleteStep(RollbackDBTestCase):
     """ Test that the function delete_step behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB
-        and all of them delete tests from the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.session_id = 1
         stepd1 = StepDescription(session_id=self.session_id, name='step1', command='command1')
@@ -2188,25 +1839,16 @@ class TestDeleteStep(unittest.TestCase):
         stepd2 = StepDescription(session_id=self.session_id, name='step2', command='command2')
         self.step2 = Step(step_description_id=2, start_time=123, stop_time=123,
                           status='status2', progress='progress2', jobid=2, instance_name="step2_1")
-        self.db_test_priv.dbsession.add(stepd1)
-        self.db_test_priv.dbsession.add(stepd2)
-        self.db_test_priv.dbsession.add(self.step1)
-        self.db_test_priv.dbsession.add(self.step2)
+        self.db_test_priv.dbsession.add_all([stepd1, stepd2, self.step1, self.step2])
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(stepd1)
-        self.db_test_priv.dbsession.refresh(stepd2)
-        self.db_test_priv.dbsession.refresh(self.step1)
-        self.db_test_priv.dbsession.refresh(self.step2)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
 
     def test_delete_step_no_step(self):
         """Tests that deleting a step behaves as expected when
         no step exists with this id in the DB"""
         self.db_test_priv.delete_step(123)
-        # Check that we generated a log into the DB
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_type == 'step'")).all()
+        # Check that we didn't generate any log into the DB
+        query = select(*LOG_COLUMNS).where(ObjectActivityLogging.object_type == 'step')
+        result = self.db_test_priv.dbsession.execute(query).all()
         self.assertListEqual(result, [])
 
     def test_delete_step_step_exists(self):
@@ -2219,38 +1861,25 @@ class TestDeleteStep(unittest.TestCase):
                             'step_description_id': 2, 'instance_name': self.step2.instance_name}]
         self.assertListEqual(result, expected_result)
         # Check that we generated a log into the DB
-        filter_txt = text(f"object_type == 'step'")
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(filter_txt).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'step',
-                           'object_id': self.step1.id, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step', 'object_id': self.step1.id}).one()
+        self.assertEqual(log, ('step', self.step1.id, 'removal'))
 
 
-class TestUpdateStepStatus(unittest.TestCase):
+class TestUpdateStepStatus(RollbackDBTestCase):
     """ Test that the function update_step_status behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.step1 = Step(step_description_id=1, start_time=123, stop_time=123,
                           status='status1', progress='progress1', jobid=1, instance_name='step_1')
         self.db_test_priv.dbsession.add(self.step1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.step1)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
 
     def test_update_step_status_no_step(self):
         """Tests that updating a step status behaves as expected when
@@ -2282,26 +1911,19 @@ class TestUpdateStepStatus(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestUpdateStepJobid(unittest.TestCase):
+class TestUpdateStepJobid(RollbackDBTestCase):
     """ Test that the function update_step_jobid behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.step1 = Step(step_description_id=1, start_time=123, stop_time=123,
                           status='status1', progress='progress1', jobid=1, instance_name='step_1')
         self.db_test_priv.dbsession.add(self.step1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.step1)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
 
     def test_update_step_jobid_no_step(self):
         """Tests that updating a step jobid behaves as expected when
@@ -2333,26 +1955,19 @@ class TestUpdateStepJobid(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestUpdateStepProgress(unittest.TestCase):
+class TestUpdateStepProgress(RollbackDBTestCase):
     """ Test that the function update_step_progress behaves as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests by filling the mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
         self.step1 = Step(step_description_id=1, start_time=123, stop_time=123,
                           status='status1', progress='progress1', jobid=1, instance_name='step_1')
         self.db_test_priv.dbsession.add(self.step1)
         self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.refresh(self.step1)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.delete(self.step1)
-        self.db_test_priv.dbsession.commit()
-        self.db_test_priv.dbsession.close()
 
     def test_update_step_progress_no_step(self):
         """Tests that updating a step progress behaves as expected when
@@ -2384,19 +1999,15 @@ class TestUpdateStepProgress(unittest.TestCase):
         self.assertListEqual(result, expected_result)
 
 
-class TestLogObjectActivity(unittest.TestCase):
+class TestLogObjectActivity(RollbackDBTestCase):
     """ Test that the functions log_<object>_creation / log_<object>_removal behave
     as expected.
     """
     def setUp(self):
-        """Set up the tests by creating a mock WFM database.
-        Doing this because one of the tests adds elements to the DB.
+        """Set up the tests with the empty mock WFM database.
         """
-        self.db_test_priv = WFMDatabase(':memory:')
-        Base.metadata.create_all(bind=self.db_test_priv.engine)
-
-    def tearDown(self):
-        self.db_test_priv.dbsession.close()
+        super().setUp()
+        self.db_test_priv = self.wfm_db_mock
 
     def test_log_session_creation(self):
         """Tests that logging session creation behaves as expected
@@ -2404,18 +2015,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_session_creation(session_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'session',
-                           'object_id': object_id, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'session', 'object_id': object_id}).one()
+        self.assertEqual(log, ('session', object_id, 'creation'))
 
     def test_log_session_removal(self):
         """Tests that logging session creation removal as expected
@@ -2423,18 +2026,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_session_removal(session_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'session',
-                           'object_id': object_id, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'session', 'object_id': object_id}).one()
+        self.assertEqual(log, ('session', object_id, 'removal'))
 
     def test_log_service_creation(self):
         """Tests that logging service creation behaves as expected
@@ -2442,18 +2037,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_service_creation(service_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'service',
-                           'object_id': object_id, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'service', 'object_id': object_id}).one()
+        self.assertEqual(log, ('service', object_id, 'creation'))
 
     def test_log_service_removal(self):
         """Tests that logging service creation removal as expected
@@ -2461,18 +2048,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_service_removal(service_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'service',
-                           'object_id': object_id, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'service', 'object_id': object_id}).one()
+        self.assertEqual(log, ('service', object_id, 'removal'))
 
     def test_log_step_description_creation(self):
         """Tests that logging step description creation behaves as expected
@@ -2480,18 +2059,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_step_description_creation(step_description_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': object_id, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step_description', 'object_id': object_id}).one()
+        self.assertEqual(log, ('step_description', object_id, 'creation'))
 
     def test_log_step_description_removal(self):
         """Tests that logging step description creation removal as expected
@@ -2499,18 +2070,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_step_description_removal(step_description_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'step_description',
-                           'object_id': object_id, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step_description', 'object_id': object_id}).one()
+        self.assertEqual(log, ('step_description', object_id, 'removal'))
 
     def test_log_step_creation(self):
         """Tests that logging step creation behaves as expected
@@ -2518,18 +2081,10 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_step_creation(step_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'step',
-                           'object_id': object_id, 'activity': 'creation'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step', 'object_id': object_id}).one()
+        self.assertEqual(log, ('step', object_id, 'creation'))
 
     def test_log_step_removal(self):
         """Tests that logging step creation removal as expected
@@ -2537,18 +2092,32 @@ class TestLogObjectActivity(unittest.TestCase):
         object_id = 123
         res1 = self.db_test_priv.log_step_removal(step_id=object_id)
         self.assertEqual(res1, 1)
-        result = self.db_test_priv.dbsession.query(ObjectActivityLogging).filter(text(f"object_id == {object_id}")).all()
-        list_dicts = [item.dict() for item in result]
-        expected_result = {'id': 1, 'object_type': 'step',
-                           'object_id': object_id, 'activity': 'removal'}
-        # we do this instead of assertListEqual because the id might not be '1' since we already
-        # added some logs in the init
-        self.assertEqual(list_dicts[0]['object_type'], expected_result['object_type'])
-        self.assertEqual(list_dicts[0]['object_id'], expected_result['object_id'])
-        self.assertEqual(list_dicts[0]['activity'], expected_result['activity'])
-        for item in result:
-            self.db_test_priv.dbsession.delete(item)
-        self.db_test_priv.dbsession.commit()
+        # one() fails if there is not exactly one log
+        log = self.db_test_priv.dbsession.execute(
+            OBJECT_LOG_QUERY, {'object_type': 'step', 'object_id': object_id}).one()
+        self.assertEqual(log, ('step', object_id, 'removal'))
+
+
+
+class TestWFMDatabaseIndexes(unittest.TestCase):
+    """Tests that opening a WFM database creates its indexes.
+    """
+    def test_index_added_to_existing_db(self):
+        """Tests that an existing DB created without the activity logs index gets it
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_name = f"{tmp_dir}/wfm_db"
+            old_db = WFMDatabase(db_name)
+            with old_db.engine.begin() as connection:
+                connection.execute(text("DROP INDEX ix_oal_type_obj"))
+            old_db.engine.dispose()
+
+            wfm_db = WFMDatabase(db_name)
+            indexes = inspect(wfm_db.engine).get_indexes('object_activity_logging')
+            wfm_db.dbsession.close()
+            wfm_db.engine.dispose()
+        self.assertListEqual([(index['name'], index['column_names']) for index in indexes],
+                             [('ix_oal_type_obj', ['object_type', 'object_id'])])
 
 
 if __name__ == "__main__":
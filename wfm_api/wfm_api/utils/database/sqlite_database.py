@@ -14,6 +14,7 @@ from loguru import logger
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql import text
 
 from pax.utils.database.database import Database
@@ -39,8 +40,12 @@ class SQLiteDatabase(Database):
             # In FastAPI, more than one thread could interact with the
             # database for the same request, so for SQLite needs to
             # allow that with connect_args={"check_same_thread": False}.
+            # An in-memory database only lives as long as its connection: keep a
+            # single one for the whole engine, otherwise each pooled connection
+            # would see its own empty database.
+            pool_args = {"poolclass": StaticPool} if name == ":memory:" else {}
             self.engine = create_engine(f"sqlite:///{name}",
-                connect_args={"check_same_thread": False})
+                connect_args={"check_same_thread": False}, **pool_args)
             self.engine.connect()
         except SQLAlchemyError as exc:
             logger.critical(f"Unable to open the {name} database.")
@@ -65,18 +70,22 @@ class SQLiteDatabase(Database):
 
     def get_single_obj_query(self,
                              table_name: Any,
-                             text_query_filter: str) -> Any:
+                             text_query_filter: str,
+                             **filter_params: Any) -> Any:
         """Retrieve single entry from table_name matching the
         query filter
 
         Args:
             table_name (Any): The table (class name) to retrieve data from.
             text_query_filter (str): The sql condition.
+            filter_params (Any): The values of the bound parameters (:name) of the
+                sql condition.
 
         Returns:
             Any: The retrieved result.
         """
-        result = self.dbsession.query(table_name).filter(text(text_query_filter)).all()
+        query_filter = text(text_query_filter).bindparams(**filter_params)
+        result = self.dbsession.query(table_name).filter(query_filter).all()
         if not result:
             logger.debug(EMPTY_DOC_ERROR_MSG)
             return None
@@ -87,20 +96,24 @@ class SQLiteDatabase(Database):
 
     def get_objs_query(self,
                        table_name: Any,
-                       text_query_filter: str = None) -> List[Any]:
+                       text_query_filter: str = None,
+                       **filter_params: Any) -> List[Any]:
         """Retrieve entries from a SQL database for get API query
 
         Args:
             table_name (Any): The table (class name) to retrieve data from.
             text_query_filter (str): The sql condition.
                 Defaults to None, corresponding to get all entries.
+            filter_params (Any): The values of the bound parameters (:name) of the
+                sql condition.
 
         Returns:
             List[Any]: The retrieved result, as list of DB objects.
                 This list can be empty, in which case a warning is raised.
         """
         if text_query_filter:
-            result = self.dbsession.query(table_name).filter(text(text_query_filter)).all()
+            query_filter = text(text_query_filter).bindparams(**filter_params)
+            result = self.dbsession.query(table_name).filter(query_filter).all()
         else:
             result = self.dbsession.query(table_name).all()
         if not result:
@@ -109,19 +122,23 @@ class SQLiteDatabase(Database):
 
     def get_dicts_query(self,
                         table_sqlite: Any,
-                        text_query_filter: str = None) -> List[Dict[str, Any]]:
+                        text_query_filter: str = None,
+                        **filter_params: Any) -> List[Dict[str, Any]]:
         """Retrieve entries from a SQLite database for get API query
 
         Args:
             table_sqlite (Any): The table (class name) to retrieve data from.
             query (str): The sql condition.
                 Defaults to None, corresponding to get all entries.
+            filter_params (Any): The values of the bound parameters (:name) of the
+                sql condition.
 
         Returns:
             List[Dict[str, Any]]: The retrieved result, which can be empty, in which
                 case a debug message is raised.
         """
-        return [item.dict() for item in self.get_objs_query(table_sqlite, text_query_filter)]
+        return [item.dict()
+                for item in self.get_objs_query(table_sqlite, text_query_filter, **filter_params)]
 
     def delete_query(self,
                      item: Dict[str, Any]) -> None:
@@ -139,35 +156,43 @@ class SQLiteDatabase(Database):
     def update_sessionid(self,
                          table_name: Any,
                          update_filter: str,
-                         sessionid: int) -> None:
+                         sessionid: int,
+                         **filter_params: Any) -> None:
         """Update an entry into an SQL database
 
         Args:
             table_name (Any): The table (class name) to update data into.
             update_filter (str): The sql condition.
             sessionid (int): The new session id.
+            filter_params (Any): The values of the bound parameters (:name) of the
+                sql condition.
 
         Returns:
             None
         """
-        self.dbsession.query(table_name).filter(text(update_filter)).update({"session_id": sessionid},
-                                                                            synchronize_session="fetch")
+        query_filter = text(update_filter).bindparams(**filter_params)
+        self.dbsession.query(table_name).filter(query_filter).update({"session_id": sessionid},
+                                                                     synchronize_session="fetch")
         self.dbsession.commit() # commit the changes to the DB
 
     def update_status(self,
                       table_name: Any,
                       update_filter: str,
-                      status: str) -> None:
+                      status: str,
+                      **filter_params: Any) -> None:
         """Update an entry status into an SQL database
 
         Args:
             table_name (Any): The table (class name) to update data into.
             update_filter (str): The sql condition.
             status (str): The new status.
+            filter_params (Any): The values of the bound parameters (:name) of the
+                sql condition.
 
         Returns:
             None
         """
-        self.dbsession.query(table_name).filter(text(update_filter)).update({"status": status},
-                                                                            synchronize_session="fetch")
+        query_filter = text(update_filter).bindparams(**filter_params)
+        self.dbsession.query(table_name).filter(query_filter).update({"status": status},
+                                                                     synchronize_session="fetch")
         self.dbsession.commit() # commit the changes to the DB
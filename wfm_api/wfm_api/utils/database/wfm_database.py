@@ -3,11 +3,11 @@ data for the WFM API.
 """
 import time
 from enum import Enum
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
 from loguru import logger
 
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.sql import text
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy import exists, func, or_, select
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.orm import declarative_base
 
@@ -108,30 +108,48 @@ class Service(Base):
 
         Args:
 
+        Returns:
+            Dict[str, Any]: Subset of the Service attributes.
+        """
+        return self.info({column: getattr(self, column) for column in SERVICE_INFO_COLUMNS})
+
+    @staticmethod
+    def info(values: Mapping[str, Any]) -> Dict[str, Any]:
+        """Get meaningful information for the end user from a service columns values.
+
+        Args:
+            values (Mapping[str, Any]): Service columns values, keyed by column name.
+                                        Should at least contain the SERVICE_INFO_COLUMNS.
+
         Returns:
             Dict[str, Any]: Subset of the Service attributes.
         """
 
         srv_attributes = {
-            "id": self.id,
-            "session_id": self.session_id,
-            "name": self.name,
-            "type": self.service_type,
-            "location": self.location,
-            "status": self.status,
-            "jobid": self.jobid
+            "id": values["id"],
+            "session_id": values["session_id"],
+            "name": values["name"],
+            "type": values["service_type"],
+            "location": values["location"],
+            "status": values["status"],
+            "jobid": values["jobid"]
         }
 
-        if self.service_type == 'NFS' or self.service_type == 'DASI':
-            srv_attributes['namespace'] = self.namespace
-            srv_attributes['mountpoint'] = self.mountpoint
+        if values["service_type"] == 'NFS' or values["service_type"] == 'DASI':
+            srv_attributes['namespace'] = values["namespace"]
+            srv_attributes['mountpoint'] = values["mountpoint"]
         else:
             # SBB - default
-            srv_attributes['targets'] = self.targets
-    
+            srv_attributes['targets'] = values["targets"]
+
         return srv_attributes
 
 
+# Service columns needed to build the information returned to the end user
+SERVICE_INFO_COLUMNS = ('id', 'session_id', 'name', 'service_type', 'location', 'status',
+                        'jobid', 'namespace', 'mountpoint', 'targets')
+
+
 class NamespaceLock(Base):
     """Class for NamespaceLock table of WFM database.
     """
@@ -217,14 +235,11 @@ class Step(Base):
         Returns:
             Dict[str, Any]: Subset of the Step attributes.
         """
-        return {
-            "id": self.id,
-            "instance_name": self.instance_name,
-            "status": self.status,
-            "progress": self.progress,
-            "jobid": self.jobid,
-            "step_description_id": self.step_description_id
-        }
+        return {column: getattr(self, column) for column in STEP_INFO_COLUMNS}
+
+
+# Step columns returned to the end user
+STEP_INFO_COLUMNS = ('id', 'instance_name', 'status', 'progress', 'jobid', 'step_description_id')
 
 
 class ObjectActivityLogging(Base):
@@ -236,6 +251,8 @@ class ObjectActivityLogging(Base):
     object_id = Column(Integer) # Object Id: session id / service id / step_description id / step id
     activity = Column(String) # Activity on the object: creation / removal
     time = Column(Integer) # Activity timestamp
+    # The logs are looked up by object
+    __table_args__ = (Index('ix_oal_type_obj', object_type, object_id),)
 
     def dict(self):
         """Get meaningful information for the end user.
@@ -269,6 +286,11 @@ class WFMDatabase(SQLiteDatabase):
         # apply model
         db_model = Base.metadata.create_all(bind=self.engine)
         self.dbmodel = db_model
+        # create_all does not add indexes to the tables that already exist: create the missing
+        # ones, so that the DBs created before an index was defined get it too
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
 
     def add_session(self,
                     ses_name: str,
@@ -314,8 +336,10 @@ class WFMDatabase(SQLiteDatabase):
             int: session id
         """
         list_item = self.get_dicts_query(Session,
-                                         f"user_name == '{user_name}' AND " +
-                                         f"name == '{ses_name}' AND workflow_name == '{wkf_name}'")
+                                         "user_name == :user_name AND name == :name AND "
+                                         "workflow_name == :workflow_name",
+                                         user_name=user_name, name=ses_name,
+                                         workflow_name=wkf_name)
         if list_item:
             logger.warning(f"session {ses_name} not added because already existing")
             return list_item[0]['id']
@@ -336,7 +360,7 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of sessions.
         """
         if uname:
-            result = self.get_dicts_query(Session, f"user_name == '{uname}'")
+            result = self.get_dicts_query(Session, "user_name == :user_name", user_name=uname)
         else:
             result = self.get_dicts_query(Session)
         return result
@@ -360,12 +384,15 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[Dict[str, Any]]: List of sessions.
         """
-        query = f"name == '{sname}'"
+        query = "name == :name"
+        params = {'name': sname}
         if wname:
-            query += f" AND workflow_name == '{wname}'"
+            query += " AND workflow_name == :workflow_name"
+            params['workflow_name'] = wname
         if uname:
-            query += f" AND user_name == '{uname}'"
-        result = self.get_dicts_query(Session, query)
+            query += " AND user_name == :user_name"
+            params['user_name'] = uname
+        result = self.get_dicts_query(Session, query, **params)
         if len(result) > 0:
             return result
 
@@ -390,10 +417,12 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[Dict[str, Any]]: List of sessions (empty list or singleton)
         """
-        query = f"id == '{session_id}'"
+        query = "id == :id"
+        params = {'id': session_id}
         if uname:
-            query += f" AND user_name == '{uname}'"
-        return self.get_dicts_query(Session, query)
+            query += " AND user_name == :user_name"
+            params['user_name'] = uname
+        return self.get_dicts_query(Session, query, **params)
 
     def delete_session(self,
                        session_name: str = "",
@@ -409,10 +438,9 @@ class WFMDatabase(SQLiteDatabase):
             None
         """
         if session_name:
-            query = f"name == '{session_name}'"
+            sessions = self.get_objs_query(Session, "name == :name", name=session_name)
         else:
-            query = f"id == '{session_id}'"
-        sessions = self.get_objs_query(Session, query)
+            sessions = self.get_objs_query(Session, "id == :id", id=session_id)
         for sess in sessions:
             # Log this removal activity into the DB
             self.log_session_removal(sess.dict()['id'])
@@ -433,7 +461,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.update_status(Session, f"name == '{ses_name}'", ses_status)
+        self.update_status(Session, "name == :name", ses_status, name=ses_name)
 
     def add_nslock(self, namespace: str, srv_name: str) -> int:
         """Adds a namespace item into the NamespaceLock table
@@ -459,7 +487,8 @@ class WFMDatabase(SQLiteDatabase):
             None
         """
         # Raises an exception if there are several items
-        namespace = self.get_single_obj_query(NamespaceLock, f"ns_name == '{namespace}'")
+        namespace = self.get_single_obj_query(NamespaceLock, "ns_name == :ns_name",
+                                             ns_name=namespace)
         if not namespace:
             raise NoDocumentError(message=f"Error: Namespace {namespace} not found")
         self.delete_query(namespace)
@@ -473,7 +502,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[Dict[str, Any]]: List of namespaces.
         """
-        return self.get_dicts_query(NamespaceLock, f"ns_name == '{namespace}'")
+        return self.get_dicts_query(NamespaceLock, "ns_name == :ns_name", ns_name=namespace)
 
     def get_services_from_ns(self, namespace: str) -> List[str]:
         """Given a namespace, returns all service names that use that namespace.
@@ -484,10 +513,9 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[str]: List of service names.
         """
-        namespaces = self.get_dicts_query(NamespaceLock, f"ns_name == '{namespace}'")
-        if not namespaces:
-            return[]
-        return [ namespace['service_name'] for namespace in namespaces ]
+        # Only the service names are needed: no need to build the NamespaceLock objects
+        query = select(NamespaceLock.service_name).where(NamespaceLock.ns_name == namespace)
+        return self.dbsession.execute(query).scalars().all()
 
     def add_service(self,
                     srv: Dict[str, Any],
@@ -562,7 +590,7 @@ class WFMDatabase(SQLiteDatabase):
             int: Service id
         """
         srv_name = srv['name']
-        list_item = self.get_dicts_query(Service, f"name == '{srv_name}'")
+        list_item = self.get_dicts_query(Service, "name == :name", name=srv_name)
         if list_item:
             item = list_item[0]
             return item['id']
@@ -589,7 +617,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[Dict[str, Any]]: List of services.
         """
-        result = self.get_dicts_query(Service, f"name == '{name}'")
+        result = self._get_services_info(Service.name == name)
         if len(result) > 0:
             return result
 
@@ -605,7 +633,22 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of Services.
                                   Empty list if no service meets the condition.
         """
-        return self.get_dicts_query(Service, f"session_id == '{session_id}'")
+        return self._get_services_info(Service.session_id == session_id)
+
+    def _get_services_info(self, condition: Any) -> List[Dict[str, Any]]:
+        """Returns the info of the services matching a condition.
+
+        Args:
+            condition (Any): SQL condition on the Service columns
+
+        Returns:
+            List[Dict[str, Any]]: List of Services.
+                                  Empty list if no service meets the condition.
+        """
+        query = select(*[getattr(Service, column) for column in SERVICE_INFO_COLUMNS]) \
+            .where(condition)
+        # Plain rows are enough here: no need to build (and track) the Service objects
+        return [Service.info(row) for row in self.dbsession.execute(query).mappings()]
 
     def get_service_info_from_id(self, service_id: int) -> List[Dict[str, Any]]:
         """Given a service id, returns the associated service info.
@@ -617,7 +660,40 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of Service Items.
                                   Empty list if no service meets the condition.
         """
-        return self.get_dicts_query(Service, f"id == '{service_id}'")
+        return self.get_dicts_query(Service, "id == :id", id=service_id)
+
+    def session_has_service_in_status(self, session_id: int, status: str) -> bool:
+        """Given a session id, checks whether one of its services is in the given status.
+        The query stops at the first matching service.
+
+        Args:
+            session_id (int): Session id
+            status (str): Service status (case insensitive)
+
+        Returns:
+            bool: True if at least one of the session services is in that status - False else
+        """
+        query = exists().where(Service.session_id == session_id,
+                               func.upper(Service.status) == status.upper())
+        return self.dbsession.query(query).scalar()
+
+    def session_services_all_in_status(self, session_id: int, statuses: Iterable[str]) -> bool:
+        """Given a session id, checks whether all its services are in one of the given statuses.
+        The query stops at the first service found in another status.
+
+        Args:
+            session_id (int): Session id
+            statuses (Iterable[str]): Accepted services status (upper case)
+
+        Returns:
+            bool: True if all the session services are in one of these statuses (or if the
+                  session has no service) - False else
+        """
+        # A NULL status is in none of the statuses (NOT IN would evaluate to NULL)
+        query = exists().where(Service.session_id == session_id,
+                               or_(Service.status.is_(None),
+                                   func.upper(Service.status).notin_(statuses)))
+        return not self.dbsession.query(query).scalar()
 
     def delete_service(self, srv_name: str) -> None:
         """Given a service name, deletes all services with this name from the Service table
@@ -628,7 +704,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        services = self.get_objs_query(Service, f"name == '{srv_name}'")
+        services = self.get_objs_query(Service, "name == :name", name=srv_name)
         for srv in services:
             # Log this removal activity into the DB
             self.log_service_removal(srv.dict()['id'])
@@ -647,7 +723,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.update_sessionid(Service, f"name == '{srv_name}'", srv_sessid)
+        self.update_sessionid(Service, "name == :name", srv_sessid, name=srv_name)
 
     def update_service_status(self,
                               srv_name: str,
@@ -662,7 +738,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.update_status(Service, f"name == '{srv_name}'", srv_status)
+        self.update_status(Service, "name == :name", srv_status, name=srv_name)
 
     def add_step_description(self,
                              step_sessid: int,
@@ -708,7 +784,8 @@ class WFMDatabase(SQLiteDatabase):
         """
         # Select on the step name AND the session id it belongs to
         list_item = self.get_dicts_query(StepDescription,
-                                         f"name == '{step_name}' AND session_id == {step_sessid}")
+                                         "name == :name AND session_id == :session_id",
+                                         name=step_name, session_id=step_sessid)
         if list_item:
             item = list_item[0]
             return item['id']
@@ -746,7 +823,7 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of steps descriptions.
                                   Empty list if step name not found
         """
-        return self.get_dicts_query(StepDescription, f"name == '{name}'")
+        return self.get_dicts_query(StepDescription, "name == :name", name=name)
 
     def get_step_descriptions_from_session_id(self, session_id: int) -> List[Dict[str, Any]]:
         """Given a session id, returns all steps descriptions with that session id.
@@ -758,7 +835,8 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of steps descriptions.
                                   Empty list is if no step description meets the condition.
         """
-        return self.get_dicts_query(StepDescription, f"session_id == '{session_id}'")
+        return self.get_dicts_query(StepDescription, "session_id == :session_id",
+                                    session_id=session_id)
 
     def get_step_description(self, session_id: int, name: str) -> List[Dict[str, Any]]:
         """Given a session id and a step name, returns the corresponding steps
@@ -772,8 +850,8 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of steps descriptions (should be a singleton in our context).
                                   Empty list is if no step description meets the condition.
         """
-        return self.get_dicts_query(StepDescription,
-                                    f"session_id == {session_id} and name == '{name}'")
+        return self.get_dicts_query(StepDescription, "session_id == :session_id and name == :name",
+                                    session_id=session_id, name=name)
 
     def get_step_description_from_id(self, stepd_id: int) -> List[Dict[str, Any]]:
         """Given a step description id, returns the corresponding steps
@@ -786,7 +864,7 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of steps descriptions (should be a singleton).
                                   Empty list is if no step description meets the condition.
         """
-        return self.get_dicts_query(StepDescription, f"id == {stepd_id}")
+        return self.get_dicts_query(StepDescription, "id == :id", id=stepd_id)
 
     def update_step_description_with_step(self, stepd_id: int, step_id: int) -> int:
         """Given a step description id and a step id, append the corresponding step object to the
@@ -802,14 +880,15 @@ class WFMDatabase(SQLiteDatabase):
                  2 if query2 could not be fulfilled
         """
         # Get the step descriptions to update (singleton since query by id)
-        stepd_list = self.get_objs_query(StepDescription, f"id == '{stepd_id}'")
+        stepd_list = self.get_objs_query(StepDescription, "id == :id", id=stepd_id)
         if not stepd_list:
             return 1
         # Get the Steps to add to the step description (singleton since query by id)
-        step_list = self.get_objs_query(Step, f"id == '{step_id}'")
+        step_list = self.get_objs_query(Step, "id == :id", id=step_id)
         if not step_list:
             return 2
-        stepd_list[0].steps.append(step_list[0])
+        # Set the many-to-one side: appending to the steps collection would first load it
+        step_list[0].step_description = stepd_list[0]
         self.dbsession.commit() # commit the changes to the DB
         return 0
 
@@ -823,7 +902,8 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        step_descriptions = self.get_objs_query(StepDescription, f"id == '{step_descr_id}'")
+        step_descriptions = self.get_objs_query(StepDescription, "id == :id",
+                                                    id=step_descr_id)
         # The id is unique, but loop however to cover the case where the list is empty
         for stp in step_descriptions:
             # Log this removal activity into the DB
@@ -842,14 +922,15 @@ class WFMDatabase(SQLiteDatabase):
             Raises exception upon error
         """
         index = 1
-        step_descr = self.get_single_obj_query(StepDescription, f"id == {step_descrid}")
+        step_descr = self.get_single_obj_query(StepDescription, "id == :id", id=step_descrid)
         if not step_descr:
             raise NoDocumentError(message=f"Error: Step description id {step_descrid} not found")
-        session = self.get_single_obj_query(Session, f"id == {step_descr.session_id}")
+        session = self.get_single_obj_query(Session, "id == :id", id=step_descr.session_id)
         if not session:
             raise NoDocumentError(message=f"Error: Session id {step_descr.session_id} not found")
 
-        steps = self.get_dicts_query(Step, f"step_description_id == {step_descrid}")
+        steps = self.get_dicts_query(Step, "step_description_id == :step_description_id",
+                                     step_description_id=step_descrid)
         if steps:
             index += len(steps)
         return  f'{session.user_name}-{session.name}-{step_descr.name}_{index}'
@@ -891,7 +972,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             List[Dict[str, Any]]: List of steps.
         """
-        return self.get_dicts_query(Step)
+        return self._get_steps_info()
 
     def delete_step(self, step_id: int) -> None:
         """Given a step id, delete it from the Step table.
@@ -902,7 +983,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        steps = self.get_objs_query(Step, f"id == '{step_id}'")
+        steps = self.get_objs_query(Step, "id == :id", id=step_id)
         # The id is unique, but loop however to cover the case where the list is empty
         for stp in steps:
             # Log this removal activity into the DB
@@ -921,7 +1002,7 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.update_status(Step, f"id == {step_id}", step_status)
+        self.update_status(Step, "id == :id", step_status, id=step_id)
 
     def update_step_jobid(self,
                           step_id: int,
@@ -935,8 +1016,8 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.dbsession.query(Step).filter(text(f"id == {step_id}")).update({"jobid": jobid},
-                                                                           synchronize_session="fetch")
+        self.dbsession.query(Step).filter(Step.id == step_id).update({"jobid": jobid},
+                                                                     synchronize_session="fetch")
         self.dbsession.commit() # commit the changes to the DB
 
     def update_step_progress(self,
@@ -951,8 +1032,8 @@ class WFMDatabase(SQLiteDatabase):
         Returns:
             None
         """
-        self.dbsession.query(Step).filter(text(f"id == {step_id}")).update({"progress": progress},
-                                                                           synchronize_session="fetch")
+        self.dbsession.query(Step).filter(Step.id == step_id).update({"progress": progress},
+                                                                     synchronize_session="fetch")
         self.dbsession.commit() # commit the changes to the DB
 
     def get_steps_info_from_session_id(self, session_id: int) -> List[Dict[str, Any]]:
@@ -965,14 +1046,13 @@ class WFMDatabase(SQLiteDatabase):
             list[Dict[str, Any]]: List of Steps instances.
                                   Empty list if no step meets the condition
         """
-        # First look for the StepDescriptions from the session id.
-        # Then look for the steps given each step description id.
-        stepds = self.get_dicts_query(StepDescription, f"session_id == '{session_id}'")
-        all_steps = []
-        for stepd in stepds:
-            steps = self.get_dicts_query(Step, f"step_description_id == '{stepd['id']}'")
-            all_steps += steps
-        return all_steps
+        # Join the steps to their StepDescriptions rather than querying the steps of each
+        # step description of the session
+        query = select(*[getattr(Step, column) for column in STEP_INFO_COLUMNS]) \
+            .join(Step.step_description) \
+            .where(StepDescription.session_id == session_id) \
+            .order_by(StepDescription.id, Step.id)
+        return [dict(row) for row in self.dbsession.execute(query).mappings()]
 
     def get_steps_info_from_step_description_id(self,
                                                 step_description_id: int) -> List[Dict[str, Any]]:
@@ -985,7 +1065,7 @@ class WFMDatabase(SQLiteDatabase):
             list[Dict[str, Any]]: List of Steps instances.
                                   Empty list if no step meets the condition
         """
-        return self.get_dicts_query(Step, f"step_description_id == '{step_description_id}'")
+        return self._get_steps_info(Step.step_description_id == step_description_id)
 
     def get_steps_info_from_step_description_name(self, session_id: int,
                                                   stepd_name: str) -> List[Dict[str, Any]]:
@@ -999,11 +1079,12 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of step instances.
                                   Empty list if there is no step instance for the step.
         """
-        step_descr = self.get_single_obj_query(StepDescription, f"session_id == '{session_id}' AND "
-                                               + f"name == '{stepd_name}'")
+        step_descr = self.get_single_obj_query(StepDescription,
+                                               "session_id == :session_id AND name == :name",
+                                               session_id=session_id, name=stepd_name)
         if not step_descr:
             raise NoDocumentError(message=f"Error: No {stepd_name} step for {session_id} session")
-        return self.get_dicts_query(Step, f"step_description_id == {step_descr.id}")
+        return self._get_steps_info(Step.step_description_id == step_descr.id)
 
     def get_steps_info_from_jobid(self, jobid: int) -> List[Dict[str, Any]]:
         """Given a jobid, returns the associated steps instances info.
@@ -1015,7 +1096,22 @@ class WFMDatabase(SQLiteDatabase):
             List[Dict[str, Any]]: List of Steps instances.
                                   Empty list if no step meets the condition
         """
-        return self.get_dicts_query(Step, f"jobid == '{jobid}'")
+        return self._get_steps_info(Step.jobid == jobid)
+
+    def _get_steps_info(self, *conditions: Any) -> List[Dict[str, Any]]:
+        """Returns the info of the steps matching conditions.
+
+        Args:
+            conditions (Any): SQL conditions on the Step columns.
+                              No condition corresponds to all the steps.
+
+        Returns:
+            List[Dict[str, Any]]: List of Steps instances.
+                                  Empty list if no step meets the condition
+        """
+        query = select(*[getattr(Step, column) for column in STEP_INFO_COLUMNS]).where(*conditions)
+        # Plain rows are enough here: no need to build (and track) the Step objects
+        return [dict(row) for row in self.dbsession.execute(query).mappings()]
 
     def log_session_creation(self,
                              session_id: int) -> int:
@@ -47,8 +47,9 @@ class JobManager:
             str: the slurm job status
         """
 
+    @staticmethod
     @abstractmethod
-    def to_wfm_job_status(self, status: str) -> str:
+    def to_wfm_job_status(status: str) -> str:
         """Returns the WFM view of a slurm job status.
 
         Args:
@@ -64,7 +64,8 @@ class SlurmJobManager(JobManager):
             return status
         return SlurmJobStatus[status].value
 
-    def to_wfm_job_status(self, status: str) -> str:
+    @staticmethod
+    def to_wfm_job_status(status: str) -> str:
         """Returns the WFM view of a slurm job status.
 
         Args:
@@ -4,6 +4,7 @@ import os
 import time
 import re
 import hashlib
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 from datetime import datetime
 from fastapi import HTTPException
@@ -41,6 +42,10 @@ steps_optional_keys = [ 'location' ]
 step_services_mandatory_keys = [ 'name' ]
 step_services_optional_keys = [ 'datamovers' ]
 
+# Services states in which a service can be used (resp. is considered as stopped)
+ALLOCATED_STATES = frozenset({ServiceStatus.ALLOCATED.value, ServiceStatus.STAGEDIN.value})
+STOPPED_STATES = frozenset({ServiceStatus.STOPPED.value, ServiceStatus.STAGEDOUT.value})
+
 
 # TODO: avoid raising HTTPException from the utils files:
 #       conceptually we might want to use utils everywhere,
@@ -1338,14 +1343,9 @@ def all_services_allocated(wfm_db: WFMDatabase,
     Returns:
         bool: True if all the services are allocated - False else
     """
-    services = wfm_db.get_services_info_from_session_id(session_id)
     # No service for this session is equivalent to "all services allocated",
     # since we want to allow steps to run w/o any service
-    for service in services:
-        if service['status'].upper() not in (ServiceStatus.ALLOCATED.value,
-                                             ServiceStatus.STAGEDIN.value):
-            return False
-    return True
+    return wfm_db.session_services_all_in_status(session_id, ALLOCATED_STATES)
 
 
 def all_services_stopped(wfm_db: WFMDatabase,
@@ -1359,13 +1359,7 @@ def all_services_stopped(wfm_db: WFMDatabase,
     Returns:
         bool: True if all the services are stopped - False else
     """
-    # Get the services that belong to the session
-    services = wfm_db.get_services_info_from_session_id(session_id)
-    for service in services:
-        if service['status'].upper() not in (ServiceStatus.STOPPED.value,
-                                             ServiceStatus.STAGEDOUT.value):
-            return False
-    return True
+    return wfm_db.session_services_all_in_status(session_id, STOPPED_STATES)
 
 
 def one_service_teardown(wfm_db: WFMDatabase, session_id: int) -> bool:
@@ -1378,12 +1372,7 @@ def one_service_teardown(wfm_db: WFMDatabase, session_id: int) -> bool:
     Returns:
         bool: True if one of the services is teardown - False else
     """
-    # Get the services that belong to the session
-    services = wfm_db.get_services_info_from_session_id(session_id)
-    for service in services:
-        if service['status'].upper() == (ServiceStatus.TEARDOWN.value):
-            return True
-    return False
+    return wfm_db.session_has_service_in_status(session_id, ServiceStatus.TEARDOWN.value)
 
 
 def update_session_status_from_services(wfm_db: WFMDatabase,
@@ -1506,7 +1495,7 @@ def count_services_not_stopped(wfm_db: WFMDatabase,
                 srv_not_stopped += 1
         else:
             logger.info(f"SERVICE {sname} (type {stype}) is in status {sstatus} - NOT STOPPED")
-            if sstatus not in (ServiceStatus.STOPPED.value, ServiceStatus.STAGEDOUT.value):
+            if sstatus not in STOPPED_STATES:
                 srv_not_stopped += 1
 
     return srv_not_stopped
@@ -1849,7 +1838,7 @@ def generate_access_command(wfm_db: WFMDatabase,
         sstatus = service['status'].upper()
         # The used services should be in the allocated or staged-in state
         # in order they can be accessed
-        if sstatus in (ServiceStatus.ALLOCATED.value, ServiceStatus.STAGEDIN.value):
+        if sstatus in ALLOCATED_STATES:
             logger.debug(f"SERVICE {service['name']} (type {service['type']}) status {sstatus} "
                           "- CAN BE ACCESSED")
             allocated_services.append(service)
@@ -2005,25 +1994,37 @@ def get_rm_step_status(status: str, job_mgr: str, job_manager_commands: CommandS
     return job_manager.to_rm_job_status(status)
 
 
-def get_wfm_step_status(status: str, job_mgr: str, job_manager_commands: CommandSettings) -> str:
+def get_wfm_step_status(status: str, job_mgr: str) -> str:
     """Given a job status as managed by the RM, returns the corresponding status as
     managed by the WFM.
 
     Args:
         status (str): the status to convert
         job_mgr (str) the job manager we are using
-        job_manager_commands (CommandSettings): Job manager commands
 
     Returns:
         str: the converted status
              empty string if job manager not supported
     """
-    try:
-        job_manager = JOB_MANAGERS[job_mgr](job_manager_commands)
-    except KeyError:
+    if job_mgr not in JOB_MANAGERS:
         logger.error(f"404 response because job manager {job_mgr} is not supported")
         return ""
-    return job_manager.to_wfm_job_status(status)
+    return _to_wfm_status(status, job_mgr)
+
+
+@lru_cache(maxsize=256)
+def _to_wfm_status(status: str, job_mgr: str) -> str:
+    """Given a job status as managed by a supported job manager, returns the corresponding
+    status as managed by the WFM (computed once per status and job manager).
+
+    Args:
+        status (str): the status to convert
+        job_mgr (str) the job manager we are using
+
+    Returns:
+        str: the converted status
+    """
+    return JOB_MANAGERS[job_mgr].to_wfm_job_status(status)
 
 
 def combine_step_status_for_stopping(step_status: str,
@@ -2076,7 +2077,7 @@ def count_steps_not_stopped(wfm_db: WFMDatabase,
         current_status = combine_step_status_for_stopping(step['status'],
                                                           job_mgr,
                                                           job_manager_commands)
-        wfm_status = get_wfm_step_status(current_status.upper(), job_mgr, job_manager_commands)
+        wfm_status = get_wfm_step_status(current_status.upper(), job_mgr)
         if wfm_status != StepStatus.STOPPED.value:
             if forced_stop:
                 retcode = stop_step(wfm_db,